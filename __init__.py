@@ -3,10 +3,17 @@ ComfyUI - Arabic Text to Image Node Pack v2
 Professional Arabic-to-Image Generation Nodes
 """
 
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from .arabic_text_to_image_node import (
     ArabicTextToImageNode,
     ArabicPromptBuilderNode,
-    _translate_text,
+    METRICS,
+    argos_ready,
+    preload_argos,
+    translate_segmented,
 )
 
 # ─────────────────────────────────────────────────────────────
@@ -26,6 +33,90 @@ NODE_DISPLAY_NAME_MAPPINGS = {
 WEB_DIRECTORY = "./web"
 
 
+# ─────────────────────────────────────────────────────────────
+# Translation Executor + Single-Flight
+# الترجمة تعمل خارج حلقة الأحداث حتى لا تتوقف PromptServer
+# ─────────────────────────────────────────────────────────────
+_TRANSLATE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ARABIC_T2I_TRANSLATE_THREADS", "4")),
+    thread_name_prefix="arabic-t2i-translate",
+)
+
+
+class _SingleFlight:
+    """
+    يجمع الطلبات المتطابقة الجارية (نفس النص + المحرك) في تنفيذ واحد.
+    Waiters share one executor job; when the last waiter leaves, a job
+    that has not started yet is cancelled.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    async def run(self, key, fn, *args):
+        entry = self._inflight.get(key)
+        if entry is None:
+            loop  = asyncio.get_running_loop()
+            job   = loop.run_in_executor(_TRANSLATE_EXECUTOR, fn, *args)
+            entry = self._inflight[key] = [job, 0]
+            job.add_done_callback(lambda _job, e=entry: self._forget(key, e))
+
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():
+                entry[0].cancel()
+                self._forget(key, entry)
+
+    def _forget(self, key, entry):
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+
+
+_SINGLE_FLIGHT = _SingleFlight()
+
+# أقصى عدد نصوص في طلب /arabic_translate/batch واحد
+_BATCH_MAX_TEXTS = int(os.environ.get("ARABIC_T2I_BATCH_MAX_TEXTS", "64"))
+
+
+def _translate_one(text, engine):
+    """ترجمة نص واحد على مستوى المقاطع — يُعيد ((translated, status), stats)."""
+    results, stats = translate_segmented([text], engine)
+    return results[0], stats
+
+# client_id → إشارة الإلغاء لآخر طلب من نفس المربع
+_LATEST_BY_CLIENT = {}
+
+
+async def _translate_for_client(client_id, key, fn, *args):
+    """
+    ينفّذ fn عبر single-flight، ويُعيد None إذا وصل طلب أحدث من نفس client_id.
+    Returns None when a newer request from the same client superseded this one.
+    """
+    if not client_id:
+        return await _SINGLE_FLIGHT.run(key, fn, *args)
+
+    loop = asyncio.get_running_loop()
+    previous = _LATEST_BY_CLIENT.get(client_id)
+    if previous is not None and not previous.done():
+        previous.set_result(True)
+    superseded = _LATEST_BY_CLIENT[client_id] = loop.create_future()
+
+    work = asyncio.ensure_future(_SINGLE_FLIGHT.run(key, fn, *args))
+    try:
+        await asyncio.wait({work, superseded}, return_when=asyncio.FIRST_COMPLETED)
+        if work.done():
+            return work.result()
+        return None
+    finally:
+        if not work.done():
+            work.cancel()
+        if _LATEST_BY_CLIENT.get(client_id) is superseded:
+            del _LATEST_BY_CLIENT[client_id]
+
+
 # ─────────────────────────────────────────────────────────────
 # API Route: /arabic_translate
 # ─────────────────────────────────────────────────────────────
@@ -40,31 +131,49 @@ try:
         Body JSON:
         {
             "text": "...",
-            "engine": "..."
+            "engine": "...",
+            "client_id": "..."      (اختياري — طلب أحدث بنفس المعرّف يلغي السابق)
         }
 
         Response:
         {
             "translated": "...",
-            "status": "..."
+            "status": "...",
+            "argos_ready": true | false,
+            "segments": {"reused": n, "translated": m},
+            "superseded": true       (فقط عند الإلغاء)
         }
         """
         try:
-            data   = await request.json()
-            text   = data.get("text", "").strip()
-            engine = data.get("engine", "online - Google Translate")
+            data      = await request.json()
+            text      = data.get("text", "").strip()
+            engine    = data.get("engine", "online - Google Translate")
+            client_id = data.get("client_id")
 
             if not text:
                 return web.json_response({
                     "translated": "",
-                    "status": "Empty input text"
+                    "status": "Empty input text",
+                    "argos_ready": argos_ready(),
                 })
 
-            translated, status = _translate_text(text, engine)
+            result = await _translate_for_client(
+                client_id, (text, engine), _translate_one, text, engine,
+            )
+            if result is None:
+                return web.json_response({
+                    "translated": "",
+                    "status": "superseded",
+                    "argos_ready": argos_ready(),
+                    "superseded": True,
+                })
 
+            (translated, status), stats = result
             return web.json_response({
                 "translated": translated,
-                "status": status
+                "status": status,
+                "argos_ready": argos_ready(),
+                "segments": stats,
             })
 
         except Exception as e:
@@ -76,24 +185,99 @@ try:
                 status=500,
             )
 
-    print("Arabic Text to Image: Translation API registered at /arabic_translate")
+    @PromptServer.instance.routes.post("/arabic_translate/batch")
+    async def arabic_translate_batch_api(request):
+        """
+        POST /arabic_translate/batch
+        Body JSON:
+        {
+            "texts": ["...", "..."],
+            "engine": "...",
+            "client_id": "..."      (اختياري)
+        }
+
+        texts يجب أن تكون قائمة نصوص (حتى ARABIC_T2I_BATCH_MAX_TEXTS) — وإلا 400.
+
+        Response (بنفس ترتيب texts):
+        {
+            "results": [{"translated": "...", "status": "..."}, ...],
+            "argos_ready": true | false,
+            "segments": {"reused": n, "translated": m},
+            "superseded": true       (فقط عند الإلغاء)
+        }
+        """
+        try:
+            data  = await request.json()
+            texts = data.get("texts", []) if isinstance(data, dict) else None
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                return web.json_response(
+                    {"results": [], "status": "texts must be a list of strings"}, status=400,
+                )
+            if len(texts) > _BATCH_MAX_TEXTS:
+                return web.json_response(
+                    {"results": [], "status": f"too many texts (max {_BATCH_MAX_TEXTS})"}, status=400,
+                )
+            texts     = [t.strip() for t in texts]
+            engine    = data.get("engine", "online - Google Translate")
+            client_id = data.get("client_id")
+
+            result = await _translate_for_client(
+                client_id, ("batch", tuple(texts), engine), translate_segmented, texts, engine,
+            )
+            if result is None:
+                return web.json_response({
+                    "results": [],
+                    "argos_ready": argos_ready(),
+                    "superseded": True,
+                })
+
+            results, stats = result
+            return web.json_response({
+                "results": [
+                    {"translated": translated, "status": status}
+                    for translated, status in results
+                ],
+                "argos_ready": argos_ready(),
+                "segments": stats,
+            })
+
+        except Exception as e:
+            return web.json_response(
+                {
+                    "results": [],
+                    "status": f"Error: {str(e)}"
+                },
+                status=500,
+            )
+
+    @PromptServer.instance.routes.get("/arabic_translate/metrics")
+    async def arabic_translate_metrics_api(request):
+        """
+        GET /arabic_translate/metrics
+        مقاييس بصيغة Prometheus النصية: أزمنة المراحل، نسب إصابة الذاكرات، أخطاء المحركات.
+        """
+        return web.Response(
+            text=METRICS.render(),
+            content_type="text/plain",
+            charset="utf-8",
+            headers={"X-Prometheus-Format": "0.0.4"},
+        )
 
 except Exception as e:
     print(f"Arabic Text to Image: Failed to register translation API: {e}")
 
 
 # ─────────────────────────────────────────────────────────────
-# Load Message
+# Argos Preload (optional): ARABIC_T2I_ARGOS_PRELOAD=1
+# ─────────────────────────────────────────────────────────────
+if os.environ.get("ARABIC_T2I_ARGOS_PRELOAD", "0") == "1":
+    preload_argos()
+
+
+# ─────────────────────────────────────────────────────────────
+# Load Message (سطر واحد — التفاصيل في README)
 # ─────────────────────────────────────────────────────────────
-print("=" * 60)
-print("Arabic Text to Image Node Pack v2 loaded successfully.")
-print("Registered nodes:")
-print("  - Arabic Text to Image")
-print("  - Arabic Prompt Builder")
-print("Optional dependencies:")
-print("  pip install deep-translator   # Online translation")
-print("  pip install argostranslate    # Offline translation")
-print("=" * 60)
+print("Arabic Text to Image Node Pack v2 loaded: Arabic Text to Image, Arabic Prompt Builder (API: /arabic_translate)")
 
 
 __all__ = [
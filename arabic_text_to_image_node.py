@@ -5,7 +5,18 @@ Author: Arabic ComfyUI Community
 Version: 1.0.0
 """
 
-import torch
+import os
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# torch / comfy / مكتبات الترجمة تُستورد عند أول استخدام فقط —
+# تحميل الحزمة مع بدء ComfyUI يبقى خفيفاً (انظر benchmarks/check_import_time.py)
+
+_PACK_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 # ──────────────────────────────────────────────
@@ -39,12 +50,151 @@ SAMPLER_NAMES = [
     "ddpm", "lcm", "ddim", "uni_pc", "uni_pc_bh2",
 ]
 
+DECODE_MODES = [
+    "full - single pass (كامل)",
+    "auto - memory budget (تلقائي)",
+    "tiled - always (مجزأ)",
+]
+
+GENERATION_MODES = [
+    "single pass (تمريرة واحدة)",
+    "draft → refine (مسودة ثم تحسين)",
+]
+
 SCHEDULER_NAMES = [
     "normal", "karras", "exponential", "sgm_uniform",
     "simple", "ddim_uniform", "beta",
 ]
 
 
+# ──────────────────────────────────────────────
+#  METRICS & CONSOLE LOG
+# ──────────────────────────────────────────────
+# verbose: كل الرسائل | sampled: رسالة من كل N | quiet: التحذيرات فقط
+LOG_MODE        = os.environ.get("ARABIC_T2I_LOG", "verbose")
+LOG_SAMPLE_EVERY = max(1, int(os.environ.get("ARABIC_T2I_LOG_SAMPLE_EVERY", "20")))
+_log_counter    = [0]
+
+
+def _log(*lines):
+    """رسائل الكونسول الروتينية حسب ARABIC_T2I_LOG — التحذيرات تُطبع مباشرة بـ print."""
+    if LOG_MODE == "quiet":
+        return
+    if LOG_MODE == "sampled":
+        _log_counter[0] += 1
+        if (_log_counter[0] - 1) % LOG_SAMPLE_EVERY:
+            return
+    print("\n".join(lines))
+
+
+_ENGINE_LABELS = {"online": "google", "offline": "argos", "auto": "auto", "disable": "disabled"}
+
+
+def _engine_label(engine: str) -> str:
+    """اسم قصير للمحرك في المقاييس."""
+    prefix = engine.split(" ")[0]
+    return _ENGINE_LABELS.get(prefix, prefix)
+
+
+class _Metrics:
+    """
+    عدّادات و histograms بصيغة Prometheus النصية
+    Counters + histograms rendered in Prometheus text format for /arabic_translate/metrics.
+    إحصائيات الذاكرات المؤقتة تُقرأ لحظة العرض عبر collectors.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+    HELP = {
+        "arabic_t2i_stage_seconds":         ("histogram", "Per-stage latency (translate, encode, sample, decode)."),
+        "arabic_t2i_engine_seconds":        ("histogram", "Translation engine call latency (one batch per call)."),
+        "arabic_t2i_translations_total":    ("counter",   "Texts translated by engine and result (ok / error)."),
+        "arabic_t2i_segments_total":        ("counter",   "Prompt segments reused from cache vs newly translated."),
+        "arabic_t2i_cache_lookups_total":   ("counter",   "Cache lookups by cache and result."),
+        "arabic_t2i_cache_bytes":           ("gauge",     "Bytes held by size-bounded caches."),
+        "arabic_t2i_normalize_chars_total": ("counter",   "Characters of unique input texts before / after normalization."),
+        "arabic_t2i_normalize_keys_total":  ("counter",   "Unique texts per batch before / after normalization."),
+        "arabic_t2i_glossary_spans_total":  ("counter",   "Text spans resolved by the phrase table (hit) vs sent on to cache / engine (miss)."),
+        "arabic_t2i_auto_routes_total":     ("counter",   "Auto-engine wins by engine and route (primary / hedge / fallback)."),
+        "arabic_t2i_engine_ewma_seconds":   ("gauge",     "Smoothed engine latency used by the auto router."),
+        "arabic_t2i_engine_error_rate":     ("gauge",     "Smoothed engine error rate used by the auto router."),
+        "arabic_t2i_engine_breaker_open":   ("gauge",     "1 while the engine circuit breaker is open."),
+        "arabic_t2i_daemon_requests_total": ("counter",   "Batches sent to the shared translation daemon (ok) or translated in-process (fallback)."),
+        "arabic_t2i_argos_workers_ready":   ("gauge",     "Argos worker processes with a loaded model."),
+        "arabic_t2i_argos_queue_depth":     ("gauge",     "Batches waiting for an Argos worker."),
+    }
+
+    def __init__(self):
+        self._lock       = threading.Lock()
+        self._counters   = {}
+        self._histograms = {}
+        self.collectors  = []
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * len(self.BUCKETS), 0.0, 0]
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    hist[0][i] += 1
+            hist[1] += seconds
+            hist[2] += 1
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("arabic_t2i_stage_seconds", time.perf_counter() - start, stage=stage)
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        items = list(labels) + list(extra)
+        if not items:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+    def render(self) -> str:
+        samples = {}   # name → [line, ...]
+        with self._lock:
+            counters   = dict(self._counters)
+            histograms = {k: ([*v[0]], v[1], v[2]) for k, v in self._histograms.items()}
+        for collect in self.collectors:
+            for name, labels, value in collect():
+                counters[self._key(name, labels)] = value
+
+        for (name, labels), value in sorted(counters.items()):
+            samples.setdefault(name, []).append(f"{name}{self._labels(labels)} {value}")
+        for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+            lines = samples.setdefault(name, [])
+            for bound, n in zip(self.BUCKETS, buckets):
+                lines.append(f"{name}_bucket{self._labels(labels, [('le', bound)])} {n}")
+            lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{self._labels(labels)} {total}")
+            lines.append(f"{name}_count{self._labels(labels)} {count}")
+
+        out = []
+        for name, lines in samples.items():
+            kind, text = self.HELP.get(name, ("untyped", name))
+            out += [f"# HELP {name} {text}", f"# TYPE {name} {kind}", *lines]
+        return "\n".join(out) + "\n"
+
+
+METRICS = _Metrics()
+
+
 # ──────────────────────────────────────────────
 #  MAIN NODE CLASS
 # ──────────────────────────────────────────────
@@ -64,6 +214,7 @@ class ArabicTextToImageNode:
     TRANSLATION_ENGINES = [
         "online - Google Translate (إنترنت)",
         "offline - Argos Translate (لا إنترنت)",
+        "auto - fastest available (تلقائي)",
         "disable - no translation (بدون ترجمة)",
     ]
 
@@ -153,6 +304,54 @@ class ArabicTextToImageNode:
                     "tooltip": "رقم البذرة — نفس الرقم يعطي نفس الصورة دائمًا",
                 }),
             },
+            "optional": {
+                # ── التوليد الدفعي ─────────────────────────────
+                "batch_size": ("INT", {
+                    "default": 1, "min": 1, "max": 64, "step": 1,
+                    "tooltip": "عدد الصور في تمريرة توليد واحدة (seed, seed+1, ...)",
+                }),
+                "seed_list": ("STRING", {
+                    "multiline": False,
+                    "default":   "",
+                    "tooltip":   "قائمة seeds مفصولة بفواصل — صورة لكل seed في نفس الدفعة",
+                }),
+                "prompt_variants": ("STRING", {
+                    "multiline": True,
+                    "default":   "",
+                    "tooltip":   "نسخ بديلة للبرومبيت الإيجابي، سطر لكل نسخة — تحل محل positive_prompt",
+                }),
+
+                # ── فك الترميز (VAE) ───────────────────────────
+                "decode_mode": (DECODE_MODES, {
+                    "default": DECODE_MODES[0],
+                    "tooltip": "auto: فك كامل إن كفت الميزانية وإلا مجزأ — tiled: مجزأ دائماً",
+                }),
+                "decode_memory_mb": ("INT", {
+                    "default": 2048, "min": 256, "max": 65536, "step": 256,
+                    "tooltip": "ميزانية ذاكرة فك الترميز — يُحدَّد منها حجم البلاطات تلقائياً",
+                }),
+
+                # ── مسودة ثم تحسين / Latent جاهز ─────────────
+                "latent_image": ("LATENT", {
+                    "tooltip": "ابدأ من Latent موجود بدل الأصفار — أبعاده تحل محل الدقة، و denoise يحدد قوة التغيير",
+                }),
+                "generation_mode": (GENERATION_MODES, {
+                    "default": GENERATION_MODES[0],
+                    "tooltip": "مسودة بدقة أصغر ثم تكبير الـ Latent وتمريرة تحسين قصيرة بالدقة النهائية",
+                }),
+                "draft_scale": ("FLOAT", {
+                    "default": 0.5, "min": 0.25, "max": 1.0, "step": 0.05,
+                    "tooltip": "نسبة دقة المسودة إلى الدقة النهائية",
+                }),
+                "refine_steps": ("INT", {
+                    "default": 12, "min": 1, "max": 150, "step": 1,
+                    "tooltip": "عدد خطوات تمريرة التحسين",
+                }),
+                "refine_denoise": ("FLOAT", {
+                    "default": 0.45, "min": 0.0, "max": 1.0, "step": 0.01,
+                    "tooltip": "قوة إزالة الضوضاء في تمريرة التحسين (تمريرة جزئية)",
+                }),
+            },
         }
 
     # ── المخرجات ───────────────────────────────────
@@ -172,74 +371,1351 @@ class ArabicTextToImageNode:
         resolution_preset,  width, height,
         steps, cfg, sampler_name, scheduler, denoise,
         seed,
+        batch_size=1, seed_list="", prompt_variants="",
+        decode_mode=DECODE_MODES[0], decode_memory_mb=2048,
+        latent_image=None, generation_mode=GENERATION_MODES[0],
+        draft_scale=0.5, refine_steps=12, refine_denoise=0.45,
     ):
-        import comfy.sample
-        import latent_preview
+        import torch
+        import comfy.utils
+
+        # 0. تحديد عناصر الدفعة: برومبيت + seed لكل صورة
+        variants   = [v.strip() for v in prompt_variants.split("\n") if v.strip()]
+        seeds      = _parse_seed_list(seed_list)
+        source     = latent_image["samples"] if latent_image is not None else None
+        noise_mask = latent_image.get("noise_mask") if latent_image is not None else None
+        count      = max(batch_size, len(seeds), len(variants),
+                         source.shape[0] if source is not None else 1)
+        item_seeds = (seeds + [(seed + i) & 0xFFFFFFFFFFFFFFFF for i in range(len(seeds), count)])[:count]
+        prompts    = variants or [positive_prompt]
+        unique     = list(dict.fromkeys(prompts))
 
-        # 1. ترجمة البرومبيتين إذا لزم
-        pos_final, pos_status = _translate_text(positive_prompt, translation_engine)
-        neg_final, neg_status = _translate_text(negative_prompt, translation_engine)
+        # 1. ترجمة البرومبيتات إذا لزم (دفعة واحدة، على مستوى المقاطع)
+        with METRICS.timer("translate"):
+            translated, seg_stats = translate_segmented(unique + [negative_prompt], translation_engine)
+        neg_final, neg_status = translated[-1]
+        pos_by_prompt = dict(zip(unique, translated[:-1]))
+        pos_items     = [pos_by_prompt[prompts[i % len(prompts)]][0] for i in range(count)]
+        pos_final     = "\n".join(dict.fromkeys(pos_items))
+        pos_status    = _merge_status(translated[:-1])
 
         # 2. تحديد الأبعاد الفعلية
         preset_w, preset_h = RESOLUTION_PRESETS[resolution_preset]
         final_w = (width  if preset_w == 0 else preset_w) // 64 * 64
         final_h = (height if preset_h == 0 else preset_h) // 64 * 64
+        if source is not None:
+            final_h, final_w = source.shape[-2] * 8, source.shape[-1] * 8
+        two_pass = generation_mode.startswith("draft") and draft_scale < 1.0
+        draft_w  = max(64, int(final_w * draft_scale) // 64 * 64)
+        draft_h  = max(64, int(final_h * draft_scale) // 64 * 64)
 
-        print(f"\n{'='*58}")
-        print(f"  🎨 Arabic T2I Node v3 — بدء التوليد")
-        print(f"  📐 الدقة  : {final_w} × {final_h}  [{resolution_preset}]")
-        print(f"  🔢 Steps  : {steps}  |  CFG: {cfg}  |  Seed: {seed}")
-        print(f"  ⚙️  Sampler: {sampler_name}  |  Sched: {scheduler}")
-        print(f"  ✅ Pos ({pos_status}): {pos_final[:70]}...")
-        print(f"  🚫 Neg ({neg_status}): {neg_final[:70]}...")
-        print(f"{'='*58}\n")
-
-        # 3. ترميز النصوص عبر CLIP
-        def encode(text):
-            tokens = clip.tokenize(text)
-            cond, pooled = clip.encode_from_tokens(tokens, return_pooled=True)
-            return [[cond, {"pooled_output": pooled}]]
-
-        positive_cond = encode(pos_final)
-        negative_cond = encode(neg_final)
-
-        # 4. إنشاء Latent خام
-        latent_image = torch.zeros([1, 4, final_h // 8, final_w // 8])
-
-        # 5. تشغيل KSampler
-        samples = comfy.sample.sample(
-            model,
-            noise              = comfy.sample.prepare_noise(latent_image, seed, None),
-            steps              = steps,
-            cfg                = cfg,
-            sampler_name       = sampler_name,
-            scheduler          = scheduler,
-            positive           = positive_cond,
-            negative           = negative_cond,
-            latent_image       = latent_image,
-            start_step         = 0,
-            last_step          = steps,
-            force_full_denoise = True,
-            denoise            = denoise,
-            noise_mask         = None,
-            callback           = latent_preview.prepare_callback(model, steps),
-            disable_pbar       = False,
-            seed               = seed,
-        )
+        banner = [
+            f"\n{'='*58}",
+            f"  🎨 Arabic T2I Node v3 — بدء التوليد",
+            f"  📐 الدقة  : {final_w} × {final_h}  [{resolution_preset if source is None else 'LATENT'}]",
+            f"  🔢 Steps  : {steps}  |  CFG: {cfg}  |  Seed: {seed}",
+            f"  ⚙️  Sampler: {sampler_name}  |  Sched: {scheduler}",
+        ]
+        if two_pass:
+            banner.append(f"  🪜 مسودة : {draft_w} × {draft_h}  →  تحسين {refine_steps} خطوة @ {refine_denoise}")
+        if count > 1:
+            banner.append(f"  📦 Batch  : {count} صور  |  Seeds: {item_seeds}  |  Prompts: {len(unique)}")
+        banner += [
+            f"  ✅ Pos ({pos_status}): {pos_final[:70]}...",
+            f"  🚫 Neg ({neg_status}): {neg_final[:70]}...",
+            f"  🧩 مقاطع: {seg_stats['reused']} من الذاكرة | {seg_stats['translated']} جديدة",
+            f"{'='*58}\n",
+        ]
+        _log(*banner)
+
+        # مفتاح النتيجة: كل ما يؤثر على الـ Latent (بعد الترجمة) + بصمة النموذج و CLIP
+        latent_key = RESULT_STORE.key_for([model, clip], {
+            "positive": pos_items,  "negative": neg_final,
+            "seeds":    item_seeds, "size":     [final_w, final_h],
+            "steps":    steps,      "cfg":      cfg,
+            "sampler":  sampler_name, "scheduler": scheduler,
+            "denoise":  denoise,
+            "source":   _tensor_digest(source) if source is not None else None,
+            "mask":     _tensor_digest(noise_mask) if noise_mask is not None else None,
+            "refine":   [draft_w, draft_h, refine_steps, refine_denoise] if two_pass else None,
+        })
+        image_key = RESULT_STORE.key_for([vae], {
+            "latent": latent_key, "decode_mode": decode_mode, "decode_memory_mb": decode_memory_mb,
+        }) if latent_key else None
+
+        samples = RESULT_STORE.get_latent(latent_key)
+        if samples is not None:
+            _log("  ♻️ Latent من ذاكرة النتائج — تخطّي الترميز والتوليد")
+        else:
+            # 3. ترميز النصوص عبر CLIP (مع ذاكرة مؤقتة للنتائج)
+            with METRICS.timer("encode"):
+                negative_cond = COND_CACHE.encode(clip, neg_final)
+                if len(set(pos_items)) == 1:
+                    positive_cond = COND_CACHE.encode(clip, pos_items[0])
+                else:
+                    positive_cond = _batch_conditioning(
+                        [COND_CACHE.encode(clip, text) for text in pos_items]
+                    )
+
+            # 4. Latent البداية: أصفار أو Latent المدخل (مكرر على عناصر الدفعة)
+            if source is not None:
+                start_latent = source[torch.arange(count) % source.shape[0]]
+            else:
+                start_latent = torch.zeros([count, 4, final_h // 8, final_w // 8])
+
+            def sample(latent, n_steps, strength, mask):
+                return _run_sampler(
+                    model, latent, item_seeds, n_steps, cfg, sampler_name, scheduler,
+                    positive_cond, negative_cond, strength, mask,
+                )
+
+            # 5. تشغيل KSampler — كل الدفعة في نداء واحد
+            with METRICS.timer("sample"):
+                if not two_pass:
+                    samples = sample(start_latent, steps, denoise, noise_mask)
+                else:
+                    # مسودة بدقة أصغر → تكبير الـ Latent → تمريرة تحسين جزئية بالدقة النهائية
+                    draft = comfy.utils.common_upscale(
+                        start_latent, draft_w // 8, draft_h // 8, "bislerp", "disabled",
+                    )
+                    draft = sample(draft, steps, denoise, None)
+                    upscaled = comfy.utils.common_upscale(
+                        draft, final_w // 8, final_h // 8, "bislerp", "disabled",
+                    )
+                    samples = sample(upscaled, refine_steps, refine_denoise, noise_mask)
+            RESULT_STORE.put_latent(latent_key, samples)
 
         # 6. فك ترميز الـ Latent إلى صورة
-        decoded = vae.decode(samples)
-        print(f"\n✅ اكتمل التوليد! الحجم: {decoded.shape}")
+        decoded = RESULT_STORE.get_image(image_key)
+        if decoded is None:
+            with METRICS.timer("decode"):
+                decoded = _decode_latents(vae, samples, decode_mode, decode_memory_mb)
+            RESULT_STORE.put_image(image_key, decoded)
+        _log(f"\n✅ اكتمل التوليد! الحجم: {decoded.shape}")
 
         return (decoded, {"samples": samples}, pos_final, neg_final)
 
     @classmethod
-    def IS_CHANGED(cls, positive_prompt, negative_prompt, translation_engine, seed, **kwargs):
+    def IS_CHANGED(cls, **kwargs):
+        # كل المدخلات البسيطة التي تؤثر على النتيجة — حقول المعاينة لا تؤثر
+        inputs = {
+            k: v for k, v in kwargs.items()
+            if k not in ("pos_translated_preview", "neg_translated_preview")
+            and isinstance(v, (str, int, float, bool))
+        }
+        return _stable_hash(inputs)
+
+
+def _run_sampler(model, latent, seeds, steps, cfg, sampler_name, scheduler,
+                 positive, negative, denoise, noise_mask=None):
+    """
+    نداء comfy.sample.sample الموحّد — ضوضاء مستقلة لكل عنصر
+    (العنصر i = توليد منفرد بـ seeds[i]).
+    """
+    import torch
+    import comfy.sample
+    import latent_preview
+
+    noise = torch.cat([
+        comfy.sample.prepare_noise(latent[i:i + 1], item_seed, None)
+        for i, item_seed in enumerate(seeds)
+    ])
+    return comfy.sample.sample(
+        model,
+        noise              = noise,
+        steps              = steps,
+        cfg                = cfg,
+        sampler_name       = sampler_name,
+        scheduler          = scheduler,
+        positive           = positive,
+        negative           = negative,
+        latent_image       = latent,
+        start_step         = 0,
+        last_step          = steps,
+        force_full_denoise = True,
+        denoise            = denoise,
+        noise_mask         = noise_mask,
+        callback           = latent_preview.prepare_callback(model, steps),
+        disable_pbar       = False,
+        seed               = seeds[0],
+    )
+
+
+def _tensor_digest(tensor) -> str:
+    """بصمة محتوى وأبعاد Tensor (Latent المدخل وقناعه في مفتاح النتيجة)."""
+    import hashlib
+    data = tensor.detach().float().cpu().contiguous().numpy().tobytes()
+    return hashlib.sha256(repr(tuple(tensor.shape)).encode() + data).hexdigest()
+
+
+def _split_lines(text: str) -> list:
+    """أسطر غير فارغة بعد إزالة المسافات."""
+    return [line.strip() for line in text.split("\n") if line.strip()]
+
+
+def _parse_seed_list(seed_list: str) -> list:
+    """'1, 2, 3' أو سطر لكل seed → [1, 2, 3] — القيم غير الصحيحة تُتجاهل."""
+    seeds = []
+    for token in re.split(r"[\s,،]+", seed_list or ""):
+        if token.isdigit():
+            seeds.append(int(token) & 0xFFFFFFFFFFFFFFFF)
+    return seeds
+
+
+def _batch_conditioning(conds: list) -> list:
+    """
+    يدمج conditioning لكل عنصر في دفعة واحدة على محور الـ batch.
+    أطوال التوكنز المختلفة (77 / 154 ...) تُكرَّر حتى المضاعف المشترك — كما يفعل ComfyUI.
+    """
+    import math
+    import torch
+
+    tensors = [c[0][0] for c in conds]
+    pooled  = [c[0][1].get("pooled_output") for c in conds]
+
+    length = 1
+    for t in tensors:
+        length = length * t.shape[1] // math.gcd(length, t.shape[1])
+    tensors = [t.repeat(1, length // t.shape[1], 1) for t in tensors]
+
+    cond = torch.cat(tensors)
+    pooled_out = torch.cat(pooled) if all(p is not None for p in pooled) else None
+    return [[cond, {"pooled_output": pooled_out}]]
+
+
+# ──────────────────────────────────────────────
+#  VAE DECODE  (full / memory-budgeted tiles)
+# ──────────────────────────────────────────────
+# تقدير ComfyUI لفك VAE من نوع SD عند غياب memory_used_decode (بايت لكل بكسل latent)
+_VAE_DECODE_BYTES_PER_PX = 2178 * 64 * 2
+_MIN_TILE    = 32    # بوحدات latent (= 256 بكسل)
+_MAX_OVERLAP = 16
+
+
+def _vae_decode_bytes_per_px(vae, samples) -> float:
+    """ذاكرة فك الترميز لكل بكسل latent لعنصر واحد — من VAE نفسه إن أمكن."""
+    h, w = samples.shape[-2], samples.shape[-1]
+    estimate = getattr(vae, "memory_used_decode", None)
+    if estimate is not None:
+        try:
+            dtype = getattr(vae, "vae_dtype", samples.dtype)
+            return float(estimate(samples[:1].shape, dtype)) / (h * w)
+        except Exception:
+            pass
+    return float(_VAE_DECODE_BYTES_PER_PX)
+
+
+def _decode_latents(vae, samples, decode_mode: str, memory_mb: int):
+    """
+    فك ترميز الـ Latent حسب الوضع:
+      full  → vae.decode على الدفعة كاملة (السلوك الأصلي)
+      auto  → كامل إن كفت الميزانية، وإلا بلاطات
+      tiled → بلاطات متداخلة دائماً (vae.decode_tiled يمزج الحواف)
+    في وضعَي auto/tiled تُفك عناصر الدفعة واحداً تلو الآخر لخفض ذروة الذاكرة.
+    """
+    if decode_mode.startswith("full"):
+        return vae.decode(samples)
+
+    import torch
+    batch, h, w = samples.shape[0], samples.shape[-2], samples.shape[-1]
+    budget      = memory_mb * 1024 * 1024
+    per_px      = _vae_decode_bytes_per_px(vae, samples)
+
+    if decode_mode.startswith("auto") and per_px * batch * h * w <= budget:
+        return vae.decode(samples)
+
+    # أكبر بلاطة مربعة تتسع لها الميزانية، بمضاعفات 8
+    tile = int((budget / per_px) ** 0.5) // 8 * 8
+    tile = max(_MIN_TILE, tile)
+    fits = (tile >= h and tile >= w) or not hasattr(vae, "decode_tiled")
+    if not fits:
+        overlap = min(_MAX_OVERLAP, tile // 4)
+        _log(f"  🧱 VAE: فك مجزأ — بلاطة {tile * 8}px، تداخل {overlap * 8}px")
+
+    images = []
+    for i in range(batch):
+        item = samples[i:i + 1]
+        if fits:
+            images.append(vae.decode(item))
+        else:
+            images.append(vae.decode_tiled(item, tile_x=tile, tile_y=tile, overlap=overlap))
+    return torch.cat(images)
+
+
+# ──────────────────────────────────────────────
+#  RESULT CACHE  (disk-backed latent store)
+# ──────────────────────────────────────────────
+RESULT_CACHE_MB     = float(os.environ.get("ARABIC_T2I_RESULT_CACHE_MB", "0"))
+RESULT_CACHE_IMAGES = os.environ.get("ARABIC_T2I_RESULT_CACHE_IMAGES", "0") == "1"
+RESULT_CACHE_DIR    = os.environ.get(
+    "ARABIC_T2I_RESULT_CACHE_DIR",
+    os.path.join(_PACK_DIR, "cache", "results"),
+)
+
+
+def _stable_hash(data) -> str:
+    """بصمة ثابتة بين التشغيلات (JSON مرتّب) — بخلاف hash() في بايثون."""
+    import hashlib
+    import json
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_FINGERPRINTS    = {}   # id(inner model) → (weakref, بصمة العينة)
+_TENSOR_DIGESTS  = {}   # id(tensor) → (weakref, بصمة المحتوى)
+_FINGERPRINT_MAX_DEPTH = 24
+
+# خصائص ModelPatcher التي تغيّر المخرج دون تغيير الأوزان الأساسية
+_PATCHER_STATE = (
+    "patches", "object_patches", "model_options", "weight_wrapper_patches",
+    "hook_patches", "additional_models", "wrappers", "callbacks", "injections",
+)
+
+
+def _remember(memo: dict, obj, value: str):
+    """
+    يحفظ قيمة لكائن في memo بمفتاح id(obj)؛ المدخل يُحذف عند موت الكائن
+    (تحميل وإزالة LoRA في خادم طويل العمر لا يُنمّي الذاكرة).
+    """
+    key = id(obj)
+
+    def forget(ref):
+        if memo.get(key, (None,))[0] is ref:
+            del memo[key]
+
+    memo[key] = (weakref.ref(obj, forget), value)
+
+
+class _Unfingerprintable(Exception):
+    """قيمة لا يمكن بناء بصمة موثوقة لها — يُتخطى التخزين."""
+
+
+def _tensor_content_digest(tensor) -> str:
+    """بصمة كامل محتوى Tensor — تُحسب مرة لكل Tensor (أوزان LoRA مثلاً)."""
+    cached = _TENSOR_DIGESTS.get(id(tensor))
+    if cached is not None and cached[0]() is tensor:
+        return cached[1]
+    import hashlib
+    import torch
+    data = tensor.detach().cpu().contiguous().view(-1)
+    h    = hashlib.sha256(f"{data.dtype}{tuple(tensor.shape)}".encode())
+    if data.numel():
+        h.update(data.view(torch.uint8).numpy().tobytes())
+    digest = h.hexdigest()
+    try:
+        _remember(_TENSOR_DIGESTS, tensor, digest)
+    except TypeError:
+        pass
+    return digest
+
+
+def _weights_sample_digest(inner) -> str:
+    """
+    بصمة الأوزان الأساسية: النوع + عدد المعاملات + عينة من أول وآخر الأوزان.
+    (تجزئة كامل النموذج مكلفة — الفرق بين نقطتي تفتيش يظهر في العينة.)
+    """
+    cached = _FINGERPRINTS.get(id(inner))
+    if cached is not None and cached[0]() is inner:
+        return cached[1]
+    import hashlib
+    params = list(inner.parameters()) if hasattr(inner, "parameters") else []
+    if not params:
+        raise _Unfingerprintable(type(inner).__name__)
+    h = hashlib.sha256(type(inner).__name__.encode())
+    h.update(str(len(params)).encode())
+    for param in params[:2] + params[-2:]:
+        sample = param.detach().flatten()[:256].float().cpu()
+        h.update(repr(sample.tolist()).encode())
+    digest = h.hexdigest()
+    _remember(_FINGERPRINTS, inner, digest)
+    return digest
+
+
+def _digest_value(h, value, seen: set, depth: int, base=None):
+    """
+    يضيف محتوى قيمة إلى البصمة: Tensors بمحتواها، الدوال بالكود والمتغيرات المغلقة،
+    الكائنات بخصائصها. أي قيمة غير معروفة ترفع _Unfingerprintable.
+    """
+    import functools
+    import types
+    import torch
+
+    if depth > _FINGERPRINT_MAX_DEPTH:
+        raise _Unfingerprintable("too deep")
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+        return
+    if isinstance(value, torch.Tensor):
+        h.update(f"T:{_tensor_content_digest(value)};".encode())
+        return
+    if base is not None and value is base:
+        h.update(b"<base model>;")   # النموذج الأساسي نفسه — بصمته في العينة
+        return
+    if isinstance(value, type):
+        h.update(f"C:{value.__module__}.{value.__qualname__};".encode())
+        return
+
+    if id(value) in seen:
+        h.update(b"<cycle>;")
+        return
+    seen.add(id(value))
+    step = lambda v: _digest_value(h, v, seen, depth + 1, base)
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        h.update(f"{type(value).__name__}[{len(value)}](".encode())
+        items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+        for item in items:
+            step(item)
+        h.update(b");")
+    elif isinstance(value, dict):
+        h.update(f"dict[{len(value)}](".encode())
+        for key in sorted(value, key=repr):
+            step(key)
+            step(value[key])
+        h.update(b");")
+    elif hasattr(value, "patches") and hasattr(value, "model"):   # ModelPatcher متداخل
+        h.update(f"P:{_patcher_digest(value, seen, depth + 1)};".encode())
+    elif isinstance(value, torch.nn.Module):
+        h.update(f"M:{type(value).__module__}.{type(value).__qualname__}(".encode())
+        for name, tensor in sorted(value.state_dict(keep_vars=True).items()):
+            h.update(name.encode())
+            step(tensor)
+        for name, attr in sorted(vars(value).items()):
+            if not name.startswith("_"):
+                step(name)
+                step(attr)
+        h.update(b");")
+    elif isinstance(value, functools.partial):
+        h.update(b"partial(")
+        step(value.func)
+        step(value.args)
+        step(value.keywords)
+        h.update(b");")
+    elif isinstance(value, types.MethodType):
+        h.update(b"method(")
+        step(value.__func__)
+        step(value.__self__)
+        h.update(b");")
+    elif isinstance(value, types.FunctionType):
+        code = value.__code__
+        h.update(f"F:{value.__module__}.{value.__qualname__}:".encode())
+        h.update(code.co_code)
+        step(tuple(c for c in code.co_consts if not isinstance(c, types.CodeType)))
+        step(value.__defaults__)
+        step(value.__kwdefaults__)
+        step(tuple(cell.cell_contents for cell in value.__closure__ or ()))
+        h.update(b";")
+    elif isinstance(value, types.BuiltinFunctionType):
+        h.update(f"B:{getattr(value, '__module__', '')}.{value.__qualname__};".encode())
+    elif hasattr(value, "__dict__") or hasattr(type(value), "__slots__"):
+        h.update(f"O:{type(value).__module__}.{type(value).__qualname__}(".encode())
+        state = dict(vars(value)) if hasattr(value, "__dict__") else {}
+        for slot in getattr(type(value), "__slots__", ()):
+            if hasattr(value, slot):
+                state[slot] = getattr(value, slot)
+        step(state)
+        h.update(b");")
+    else:
+        raise _Unfingerprintable(type(value).__name__)
+
+
+def _patcher_digest(patcher, seen: set, depth: int = 0) -> str:
+    """الأوزان الأساسية (عينة) + كامل حالة الـ patches والخيارات."""
+    import hashlib
+    inner = getattr(patcher, "model", None)
+    h = hashlib.sha256(_weights_sample_digest(inner).encode())
+    for name in _PATCHER_STATE:
+        h.update(name.encode())
+        _digest_value(h, getattr(patcher, name, None), seen, depth, base=inner)
+    return h.hexdigest()
+
+
+def _object_fingerprint(obj) -> str:
+    """
+    بصمة ثابتة لـ MODEL / CLIP / VAE بين التشغيلات:
+    عينة من الأوزان الأساسية + محتوى كل الـ patches (LoRA) و model_options و
+    object_patches + CLIP skip (layer_idx). يُعيد "" إذا تعذّر بناء بصمة موثوقة
+    (فيُتخطى التخزين بدل إرجاع نتيجة مهمة أخرى).
+    """
+    try:
         import hashlib
-        h = hashlib.md5(
-            f"{positive_prompt}{negative_prompt}{translation_engine}{seed}".encode()
-        ).hexdigest()
-        return h
+        h = hashlib.sha256(type(obj).__name__.encode())
+        patcher = obj if hasattr(obj, "patches") else getattr(obj, "patcher", None)
+        if patcher is not None:
+            h.update(_patcher_digest(patcher, set()).encode())
+        else:
+            inner = getattr(obj, "first_stage_model", None) or getattr(obj, "model", None)
+            h.update(_weights_sample_digest(inner).encode())
+        if patcher is not obj:
+            # خصائص CLIP / VAE خارج الـ patcher (CLIPSetLastLayer يضبط layer_idx)
+            for name in ("layer_idx", "tokenizer_options"):
+                h.update(name.encode())
+                _digest_value(h, getattr(obj, name, None), set(), 0)
+        return h.hexdigest()
+    except Exception:
+        return ""
+
+
+class LatentResultStore:
+    """
+    مخزن نتائج على القرص: Latent (وصورة اختيارياً) لكل مفتاح مهمة
+    Disk store of sampled latents keyed by a hash of every output-affecting input.
+
+    الملفات بصيغة .npy (قابلة لـ mmap)، والإخلاء حسب الحجم بترتيب آخر استخدام.
+    الصور تُحفظ uint8 فقط عند ARABIC_T2I_RESULT_CACHE_IMAGES=1.
+    """
+
+    def __init__(self, directory: str, max_mb: float, store_images: bool):
+        self.directory    = directory
+        self.max_bytes    = int(max(0.0, max_mb) * 1024 * 1024)
+        self.store_images = store_images
+        self._lock        = threading.Lock()
+        self._total       = None
+        self.hits         = 0
+        self.image_hits   = 0
+        self.misses       = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and bool(self.directory)
+
+    def key_for(self, objects: list, params: dict) -> str:
+        if not self.enabled:
+            return ""
+        fingerprints = [_object_fingerprint(obj) for obj in objects]
+        if not all(fingerprints):
+            return ""
+        return _stable_hash({"objects": fingerprints, "params": params})
+
+    def _path(self, key: str, kind: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.{kind}.npy")
+
+    def _load(self, key: str, kind: str):
+        import numpy as np
+        import torch
+        path = self._path(key, kind)
+        try:
+            array = np.load(path, mmap_mode="r")
+            tensor = torch.from_numpy(np.array(array))
+            os.utime(path)
+            return tensor
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, key: str, kind: str, array):
+        import numpy as np
+        path = self._path(key, kind)
+        tmp  = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ Arabic T2I: تعذّر حفظ النتيجة ({e})")
+            return
+        with self._lock:
+            if self._total is not None:
+                self._total += os.path.getsize(path)
+        self._evict()
+
+    def get_latent(self, key: str):
+        if not key:
+            return None
+        tensor = self._load(key, "latent")
+        with self._lock:
+            if tensor is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return tensor
+
+    def put_latent(self, key: str, samples):
+        import torch
+        if key:
+            if samples.dtype == torch.bfloat16:
+                samples = samples.float()
+            self._save(key, "latent", samples.detach().cpu().numpy())
+
+    def get_image(self, key: str):
+        if not key or not self.store_images:
+            return None
+        tensor = self._load(key, "image")
+        if tensor is None:
+            return None
+        with self._lock:
+            self.image_hits += 1
+        return tensor.float() / 255.0
+
+    def put_image(self, key: str, images):
+        import torch
+        if key and self.store_images:
+            array = (images.detach().cpu().clamp(0, 1) * 255.0).round().to(torch.uint8)
+            self._save(key, "image", array.numpy())
+
+    def _scan(self) -> list:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".npy"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._scan())
+            if self._total <= self.max_bytes:
+                return
+            for _, size, path in sorted(self._scan()):
+                if self._total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    self._total -= size
+                except OSError:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits":       self.hits,
+                "image_hits": self.image_hits,
+                "misses":     self.misses,
+                "hit_rate":   self.hits / lookups if lookups else 0.0,
+                "bytes":      self._total or 0,
+                "max_bytes":  self.max_bytes,
+            }
+
+
+RESULT_STORE = LatentResultStore(RESULT_CACHE_DIR, RESULT_CACHE_MB, RESULT_CACHE_IMAGES)
+
+
+def _cache_metrics():
+    """يحوّل stats() للذاكرات المؤقتة إلى عيّنات Prometheus."""
+    lookups = "arabic_t2i_cache_lookups_total"
+    t = TRANSLATION_CACHE.stats()
+    c = COND_CACHE.stats()
+    r = RESULT_STORE.stats()
+    return [
+        (lookups, {"cache": "translation", "result": "hit"},      t["hits"]),
+        (lookups, {"cache": "translation", "result": "disk_hit"}, t["disk_hits"]),
+        (lookups, {"cache": "translation", "result": "miss"},     t["misses"]),
+        (lookups, {"cache": "conditioning", "result": "hit"},     c["hits"]),
+        (lookups, {"cache": "conditioning", "result": "miss"},    c["misses"]),
+        (lookups, {"cache": "result", "result": "hit"},           r["hits"]),
+        (lookups, {"cache": "result", "result": "miss"},          r["misses"]),
+        ("arabic_t2i_cache_bytes", {"cache": "conditioning"},     c["bytes"]),
+        ("arabic_t2i_cache_bytes", {"cache": "result"},           r["bytes"]),
+    ]
+
+
+METRICS.collectors.append(_cache_metrics)
+
+
+# ──────────────────────────────────────────────
+#  ARABIC NORMALIZATION  (before cache + engine)
+# ──────────────────────────────────────────────
+# كل قاعدة = جدول استبدال حروف؛ القواعد المفعّلة تُدمج في جدول واحد
+# يُطبَّق بـ str.translate (مرور واحد على النص) ثم توحيد المسافات.
+_NORMALIZE_RULES = {
+    # الحركات والتنوين والشدة والسكون + علامات القرآن
+    "tashkeel": {c: None for c in [*range(0x0610, 0x061B), *range(0x064B, 0x0660), 0x0670,
+                                   *range(0x06D6, 0x06DD), *range(0x06DF, 0x06E9), *range(0x06EA, 0x06EE)]},
+    "tatweel":  {0x0640: None},
+    "alef":     {ord(c): "ا" for c in "أإآٱ"},
+    "punct":    {ord("،"): ",", ord("؛"): ";", ord("؟"): "?"},
+    # قواعد اختيارية (قد تغيّر المعنى في حالات نادرة)
+    "yaa":      {ord("ى"): "ي"},
+    "taa":      {ord("ة"): "ه"},
+}
+NORMALIZE_DEFAULT = "tashkeel,tatweel,alef,punct"
+NORMALIZE_RULES   = [
+    rule.strip() for rule in os.environ.get("ARABIC_T2I_NORMALIZE", NORMALIZE_DEFAULT).split(",")
+    if rule.strip() in _NORMALIZE_RULES
+]
+
+_NORMALIZE_TABLE = {c: r for rule in NORMALIZE_RULES for c, r in _NORMALIZE_RULES[rule].items()}
+
+
+def normalize_arabic(text: str) -> str:
+    """
+    توحيد النص العربي قبل الذاكرة المؤقتة والترجمة: القواعد في ARABIC_T2I_NORMALIZE
+    (tashkeel, tatweel, alef, punct, yaa, taa — أو "none")، والمسافات الزائدة تُزال دائماً.
+    "سَيَّارَة" و "سيــارة" تصبحان مفتاحاً واحداً وترجمة واحدة.
+    """
+    return " ".join(text.translate(_NORMALIZE_TABLE).split())
+
+
+# ──────────────────────────────────────────────
+#  PHRASE TABLE  (glossary fast path)
+# ──────────────────────────────────────────────
+PHRASE_TABLE_ENABLED = os.environ.get("ARABIC_T2I_PHRASE_TABLE", "1") == "1"
+GLOSSARY_PATH        = os.environ.get("ARABIC_T2I_GLOSSARY_PATH", os.path.join(_PACK_DIR, "glossary.json"))
+GLOSSARY_STATUS      = "✅ قاموس المصطلحات"
+
+# مفردات البرومبيت الشائعة (جودة، إضاءة، أساليب، لقطات) — عبارات كاملة
+# قدر الإمكان حتى لا يختلط ترتيب الصفة والموصوف مع الأجزاء المترجمة آلياً.
+_BUILTIN_GLOSSARY = {
+    # الجودة والتفاصيل
+    "تحفة فنية":        "masterpiece",
+    "أفضل جودة":        "best quality",
+    "جودة عالية":       "high quality",
+    "جودة فائقة":       "ultra high quality",
+    "تفاصيل دقيقة":     "intricate details",
+    "تفاصيل عالية":     "highly detailed",
+    "دقة عالية":        "high resolution",
+    "واقعي":            "realistic",
+    "واقعية مفرطة":     "hyperrealistic",
+    "تركيز حاد":        "sharp focus",
+    "عمق الميدان":      "depth of field",
+    "خلفية ضبابية":     "blurred background",
+    "بوكيه":            "bokeh",
+    # الإضاءة والوقت
+    "إضاءة سينمائية":   "cinematic lighting",
+    "إضاءة ناعمة":      "soft lighting",
+    "إضاءة درامية":     "dramatic lighting",
+    "إضاءة طبيعية":     "natural lighting",
+    "إضاءة استوديو":    "studio lighting",
+    "إضاءة خلفية":      "backlighting",
+    "إضاءة نيون":       "neon lighting",
+    "ظلال درامية":      "dramatic shadows",
+    "الساعة الذهبية":   "golden hour",
+    "الساعة الزرقاء":   "blue hour",
+    "ضوء القمر":        "moonlight",
+    "ضوء الشمس":        "sunlight",
+    "أشعة الشمس":       "sun rays",
+    "غروب الشمس":       "sunset",
+    "شروق الشمس":       "sunrise",
+    # الأساليب الفنية
+    "سينمائي":          "cinematic",
+    "فن رقمي":          "digital art",
+    "فن مفاهيمي":       "concept art",
+    "لوحة زيتية":       "oil painting",
+    "ألوان مائية":      "watercolor",
+    "رسم بالقلم الرصاص": "pencil drawing",
+    "رسم تخطيطي":       "sketch",
+    "أسلوب أنمي":       "anime style",
+    "أنمي":             "anime",
+    "مانجا":            "manga",
+    "فن البكسل":        "pixel art",
+    "ثلاثي الأبعاد":    "3d render",
+    "فن تجريدي":        "abstract art",
+    "سريالي":           "surreal",
+    "خيال علمي":        "science fiction",
+    "سايبربانك":        "cyberpunk",
+    "ستيم بانك":        "steampunk",
+    "فن إسلامي":        "islamic art",
+    "زخرفة إسلامية":    "islamic ornament",
+    "زخارف هندسية":     "geometric patterns",
+    "خط عربي":          "arabic calligraphy",
+    "طراز عتيق":        "vintage style",
+    "أبيض وأسود":       "black and white",
+    "ألوان زاهية":      "vibrant colors",
+    "ألوان باستيل":     "pastel colors",
+    "ألوان دافئة":      "warm colors",
+    "ألوان باردة":      "cool colors",
+    "تصميم بسيط":       "minimalist design",
+    # التصوير واللقطات
+    "تصوير فوتوغرافي":  "photography",
+    "تصوير احترافي":    "professional photography",
+    "لقطة سينمائية":    "cinematic shot",
+    "صورة شخصية":       "portrait",
+    "بورتريه":          "portrait",
+    "لقطة مقربة":       "close-up shot",
+    "لقطة واسعة":       "wide shot",
+    "زاوية منخفضة":     "low angle",
+    "منظر جوي":         "aerial view",
+}
+
+
+class PhraseTable:
+    """
+    قاموس مصطلحات عربي→إنجليزي مُجمّع في trie على مستوى الكلمات
+    Word-level trie over normalized glossary keys; longest match wins.
+
+    المقطع الذي تغطيه عبارات القاموس بالكامل يُترجم مباشرة بصياغة ثابتة؛ أي كلمة
+    مجهولة تُرسل المقطع كله إلى Google / Argos (لا تُفصل كلمات عن سياقها:
+    "غير واقعي" أو "مشهد سينمائي"). ملف المستخدم (JSON: {"عربي": "english"})
+    يتجاوز المدمج ويُعاد تحميله عند تغيّر mtime.
+    """
+
+    _END = ""   # مفتاح نهاية العبارة — لا توجد كلمة فارغة بعد التوحيد
+
+    def __init__(self, builtin: dict, path: str, enabled: bool = True):
+        self.enabled    = enabled
+        self.path       = path
+        self.size       = 0
+        self._builtin   = builtin
+        self._lock      = threading.Lock()
+        self._signature = ()   # لم يُجمَّع بعد
+        self._root      = {}
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except (OSError, TypeError, ValueError):
+            return None
+
+    def _load_user_entries(self) -> dict:
+        import json
+        if not self.path or not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+            if not isinstance(entries, dict):
+                raise ValueError("expected a JSON object {arabic: english}")
+            return {str(k): str(v) for k, v in entries.items()}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Arabic T2I: تجاهل قاموس المصطلحات ({self.path}): {e}")
+            return {}
+
+    def _compile(self):
+        entries = {**self._builtin, **self._load_user_entries()}
+        root, size = {}, 0
+        for arabic, english in entries.items():
+            words = normalize_arabic(arabic).split()
+            if not words or not english.strip():
+                continue
+            node = root
+            for word in words:
+                node = node.setdefault(word, {})
+            node[self._END] = english.strip()
+            size += 1
+        self._root, self.size = root, size
+
+    def _trie(self) -> dict:
+        signature = self._file_signature()
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    self._compile()
+                    self._signature = signature
+        return self._root
+
+    def split(self, key: str) -> list:
+        """
+        يقسّم نصاً موحّداً إلى عبارات القاموس: [(True, english), ...] إذا غطّته
+        بالكامل (كلمات كاملة، الأطول أولاً)، وإلا [(False, key)] — المقطع كما هو للمحرك.
+        """
+        root  = self._trie()
+        words = key.split()
+        spans = []
+        i = 0
+        while i < len(words):
+            node, match, j = root, None, i
+            while j < len(words):
+                node = node.get(words[j])
+                if node is None:
+                    break
+                j += 1
+                if self._END in node:
+                    match = (j, node[self._END])
+            if match is None:
+                return [(False, key)]
+            spans.append((True, match[1]))
+            i = match[0]
+        return spans
+
+
+PHRASE_TABLE = PhraseTable(_BUILTIN_GLOSSARY, GLOSSARY_PATH, PHRASE_TABLE_ENABLED)
+
+
+# ──────────────────────────────────────────────
+#  TRANSLATION CACHE  (Memory LRU + SQLite)
+# ──────────────────────────────────────────────
+TRANSLATION_CACHE_SIZE = int(os.environ.get("ARABIC_T2I_TRANSLATION_CACHE_SIZE", "4096"))
+TRANSLATION_CACHE_PATH = os.environ.get(
+    "ARABIC_T2I_TRANSLATION_CACHE_PATH",
+    os.path.join(_PACK_DIR, "cache", "translations.sqlite3"),
+)
+
+
+class _TranslationDiskStore:
+    """
+    مخزن دائم للترجمات على القرص (SQLite) — يبقى بعد إعادة التشغيل
+    Persistent SQLite store shared by every caller in this process.
+    أي خطأ في القرص يُعطّل المخزن بصمت بدل إيقاف التوليد.
+    """
+
+    def __init__(self, path: str):
+        self.path  = path
+        self._conn = None
+        self._lock = threading.Lock()
+        self._broken = not path
+
+    def _connect(self):
+        import sqlite3
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " engine TEXT NOT NULL, source TEXT NOT NULL,"
+                " translated TEXT NOT NULL, status TEXT NOT NULL,"
+                " PRIMARY KEY (engine, source))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _disable(self, e):
+        self._broken = True
+        print(f"⚠️ Arabic T2I: تعطيل ذاكرة الترجمة على القرص ({self.path}): {e}")
+
+    def get(self, engine: str, source: str):
+        import sqlite3
+        if self._broken:
+            return None
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT translated, status FROM translations WHERE engine=? AND source=?",
+                    (engine, source),
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._disable(e)
+                return None
+        return tuple(row) if row else None
+
+    def put(self, engine: str, source: str, value: tuple):
+        import sqlite3
+        if self._broken:
+            return
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+                    (engine, source, value[0], value[1]),
+                )
+                conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                self._disable(e)
+
+
+class TranslationCache:
+    """
+    ذاكرة ترجمة على مستويين:  LRU في الذاكرة  ←  SQLite على القرص
+    Process-wide two-tier cache keyed by (engine, normalized text).
+
+    يُشارَك بين ArabicTextToImageNode.generate و ArabicPromptBuilderNode.build
+    ومسارات /arabic_translate لأن جميعها تمر عبر translate_many.
+    """
+
+    def __init__(self, max_entries: int, disk_path: str):
+        self.max_entries = max(0, max_entries)
+        self.disk        = _TranslationDiskStore(disk_path)
+        self._lru        = OrderedDict()
+        self._lock       = threading.Lock()
+        self.hits        = 0
+        self.disk_hits   = 0
+        self.misses      = 0
+
+    def get(self, engine: str, text: str):
+        key = (engine, normalize_arabic(text))
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self.disk.get(*key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, engine: str, text: str, value: tuple):
+        key = (engine, normalize_arabic(text))
+        with self._lock:
+            self._remember(key, value)
+        self.disk.put(*key, value)
+
+    def _remember(self, key, value):
+        if not self.max_entries:
+            return
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries":   len(self._lru),
+                "max":       self.max_entries,
+                "hits":      self.hits,
+                "disk_hits": self.disk_hits,
+                "misses":    self.misses,
+                "hit_rate":  (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+TRANSLATION_CACHE = TranslationCache(TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_PATH)
+
+
+# ──────────────────────────────────────────────
+#  ARGOS TRANSLATOR  (warm, process-resident)
+# ──────────────────────────────────────────────
+class _ArgosUnavailable(Exception):
+    """Argos غير متاح (حزمة ناقصة، طابور ممتلئ، مهلة) — الرسالة هي نص الحالة المعروض للمستخدم."""
+
+
+_ARGOS_MISSING = "❌ Argos: حزمة ar→en غير مثبتة"
+
+
+class _ArgosTranslator:
+    """
+    كائن ترجمة Argos ar→en يُبنى مرة واحدة ويبقى طوال عمر العملية
+    Holds the resolved ar→en translation object for the life of the process.
+
+    يُعاد البناء فقط عند تغيّر مجلدات الحزم المثبتة (mtime)،
+    بدل استدعاء get_installed_languages() مع كل برومبيت.
+    """
+
+    def __init__(self):
+        self._lock        = threading.Lock()
+        self._translation = None
+        self._signature   = None
+        self._thread      = None
+        self.ready        = False
+        self.error        = ""
+
+    @staticmethod
+    def _package_signature():
+        import argostranslate.settings
+        dirs = getattr(argostranslate.settings, "package_dirs", None) \
+            or [argostranslate.settings.package_data_dir]
+        sig = []
+        for d in dirs:
+            try:
+                sig.append((str(d), os.stat(d).st_mtime_ns))
+            except OSError:
+                sig.append((str(d), None))
+        return tuple(sig)
+
+    def get(self, allow_install: bool = True):
+        signature = self._package_signature()
+        translation = self._translation
+        if translation is not None and signature == self._signature:
+            return translation
+
+        with self._lock:
+            if self._translation is None or signature != self._signature:
+                self.ready = False
+                try:
+                    self._translation = self._resolve(allow_install)
+                except _ArgosUnavailable as e:
+                    self.error = str(e)
+                    raise
+                # التثبيت يغيّر mtime — احسب التوقيع بعد الحل
+                self._signature = self._package_signature()
+                self.ready = True
+                self.error = ""
+            return self._translation
+
+    @staticmethod
+    def _resolve(allow_install: bool):
+        import argostranslate.package
+        import argostranslate.translate
+
+        # تحقق هل حزمة ar→en مثبتة
+        installed = argostranslate.translate.get_installed_languages()
+        codes     = {lang.code for lang in installed}
+
+        if "ar" not in codes or "en" not in codes:
+            if not allow_install:
+                raise _ArgosUnavailable(_ARGOS_MISSING)
+            # تحميل الحزمة تلقائياً (مرة واحدة فقط)
+            _log("📦 Argos: تحميل حزمة الترجمة ar→en ...")
+            argostranslate.package.update_package_index()
+            available = argostranslate.package.get_available_packages()
+            pkg = next(
+                (p for p in available if p.from_code == "ar" and p.to_code == "en"),
+                None
+            )
+            if pkg is None:
+                raise _ArgosUnavailable("❌ Argos: حزمة ar→en غير متوفرة")
+            argostranslate.package.install_from_path(pkg.download())
+            installed = argostranslate.translate.get_installed_languages()
+
+        ar_lang = next((l for l in installed if l.code == "ar"), None)
+        en_lang = next((l for l in installed if l.code == "en"), None)
+        if ar_lang is None or en_lang is None:
+            raise _ArgosUnavailable("❌ Argos: اللغات غير متوفرة بعد التثبيت")
+
+        return ar_lang.get_translation(en_lang)
+
+    def preload(self):
+        """تحميل النموذج مسبقاً في خيط خلفي — لا يُثبّت حزماً جديدة."""
+        if self._thread is not None:
+            return self._thread
+
+        def _run():
+            try:
+                self.get(allow_install=False)
+                _log("✅ Argos: نموذج ar→en جاهز في الذاكرة")
+            except ImportError:
+                self.error = "argostranslate غير مثبتة"
+            except Exception as e:
+                self.error = str(e)
+
+        self._thread = threading.Thread(target=_run, name="arabic-t2i-argos-preload", daemon=True)
+        self._thread.start()
+        return self._thread
+
+
+ARGOS_TRANSLATOR = _ArgosTranslator()
+
+
+# ──────────────────────────────────────────────
+#  ARGOS WORKER POOL  (separate processes)
+# ──────────────────────────────────────────────
+ARGOS_WORKERS        = int(os.environ.get("ARABIC_T2I_ARGOS_WORKERS", "0"))   # 0 = داخل العملية
+ARGOS_WORKER_THREADS = int(os.environ.get("ARABIC_T2I_ARGOS_THREADS", "0"))   # 0 = افتراضي ctranslate2
+ARGOS_QUEUE_SIZE     = int(os.environ.get("ARABIC_T2I_ARGOS_QUEUE", "32"))
+ARGOS_TIMEOUT        = float(os.environ.get("ARABIC_T2I_ARGOS_TIMEOUT", "60"))
+
+_ARGOS_WORKER_SCRIPT = os.path.join(_PACK_DIR, "arabic_translate_worker.py")
+
+
+class _ArgosWorker:
+    """
+    عملية ترجمة فرعية واحدة (arabic_translate_worker.py) + خيط يقرأ ردودها.
+    One child process holding its own ar→en model; replies arrive as JSON lines.
+    """
+
+    def __init__(self, index: int, threads: int):
+        import queue
+        import subprocess
+        import sys
+
+        env = dict(os.environ)
+        env["ARABIC_T2I_ARGOS_WORKERS"] = "0"
+        env.setdefault("ARGOS_INTER_THREADS", "1")
+        if threads > 0:
+            env["ARGOS_INTRA_THREADS"] = str(threads)
+            env["OMP_NUM_THREADS"]     = str(threads)
+
+        self.ready    = False
+        self.error    = ""
+        self._replies = queue.Queue()
+        self._next_id = 0
+        self.process  = subprocess.Popen(
+            [sys.executable, "-u", _ARGOS_WORKER_SCRIPT],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            text=True, encoding="utf-8", bufsize=1, env=env,
+        )
+        threading.Thread(
+            target=self._read, name=f"arabic-t2i-argos-worker-{index}", daemon=True,
+        ).start()
+
+    def _read(self):
+        import json
+        for line in self.process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if "ready" in message:
+                self.ready = bool(message["ready"])
+                self.error = message.get("error", "")
+            else:
+                self._replies.put(message)
+        self.ready = False
+        self._replies.put(None)   # انتهت العملية
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, texts: list, timeout: float) -> dict:
+        import json
+        import queue
+        self._next_id += 1
+        request_id = self._next_id
+        self.process.stdin.write(json.dumps({"id": request_id, "texts": texts}, ensure_ascii=False) + "\n")
+        self.process.stdin.flush()
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                message = self._replies.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError from None
+            if message is None:
+                raise RuntimeError("عملية الترجمة توقفت")
+            if message.get("id") == request_id:
+                return message
+
+    def stop(self):
+        self.ready = False
+        if self.alive():
+            self.process.kill()
+
+
+class _ArgosJob:
+    __slots__ = ("texts", "deadline", "done", "reply", "error", "abandoned")
+
+    def __init__(self, texts: list, deadline: float):
+        self.texts     = texts
+        self.deadline  = deadline
+        self.done      = threading.Event()
+        self.reply     = None
+        self.error     = ""
+        self.abandoned = False
+
+
+class _ArgosWorkerPool:
+    """
+    مجموعة عمليات Argos مستقلة — كل عملية بنموذجها وخيوطها
+    Fixed pool of worker processes fed from one bounded queue.
+
+    - الطابور محدود (ARGOS_QUEUE_SIZE): عند امتلائه ينتظر المستدعي حتى المهلة
+      ثم يحصل على حالة "مشغول" بدل تكدّس الطلبات بلا حد.
+    - كل طلب له مهلة (ARGOS_TIMEOUT): العامل المتأخر يُقتل ويُعاد تشغيله.
+    - الدفعة الواحدة تذهب لعامل واحد؛ الدفعات المتزامنة توزَّع على العمال.
+    """
+
+    def __init__(self, workers: int, threads: int, queue_size: int, timeout: float):
+        self.size     = max(0, workers)
+        self.threads  = threads
+        self.timeout  = timeout
+        self._queue_size = max(1, queue_size)
+        self._lock    = threading.Lock()
+        self._jobs    = None
+        self._workers = [None] * self.size
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    @property
+    def ready(self) -> bool:
+        return any(w is not None and w.ready for w in self._workers)
+
+    def start(self):
+        """تشغيل العمال (مرة واحدة) — يبدؤون تحميل النموذج فوراً."""
+        if self._jobs is not None:
+            return
+        with self._lock:
+            if self._jobs is not None:
+                return
+            import atexit
+            import queue
+            jobs = queue.Queue(maxsize=self._queue_size)
+            for index in range(self.size):
+                self._workers[index] = _ArgosWorker(index, self.threads)
+                threading.Thread(
+                    target=self._serve, args=(index, jobs),
+                    name=f"arabic-t2i-argos-dispatch-{index}", daemon=True,
+                ).start()
+            atexit.register(self.shutdown)
+            self._jobs = jobs
+            _log(f"🧵 Argos: {self.size} عملية ترجمة (خيوط لكل عملية: {self.threads or 'تلقائي'})")
+
+    def _serve(self, index: int, jobs):
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            remaining = job.deadline - time.monotonic()
+            if job.abandoned or remaining <= 0:
+                continue
+
+            worker = self._workers[index]
+            if worker is None or not worker.alive():
+                worker = self._workers[index] = _ArgosWorker(index, self.threads)
+            try:
+                job.reply = worker.request(job.texts, remaining)
+            except TimeoutError:
+                worker.stop()
+                job.error = "❌ Argos: انتهت مهلة الترجمة"
+            except Exception as e:
+                worker.stop()
+                job.error = f"❌ Argos خطأ: {e}"
+            job.done.set()
+
+    def translate(self, texts: list) -> list:
+        """
+        ترجمة دفعة عبر أول عامل متاح — يُعيد قائمة النصوص المترجمة.
+        يرفع _ArgosUnavailable برسالة الحالة عند الامتلاء أو المهلة أو خطأ العامل.
+        """
+        import queue
+        self.start()
+        job = _ArgosJob(list(texts), time.monotonic() + self.timeout)
+        try:
+            self._jobs.put(job, timeout=self.timeout)
+        except queue.Full:
+            raise _ArgosUnavailable("❌ Argos: طابور الترجمة ممتلئ — حاول لاحقاً") from None
+
+        if not job.done.wait(max(0.0, job.deadline - time.monotonic())):
+            job.abandoned = True
+            raise _ArgosUnavailable("❌ Argos: انتهت مهلة الترجمة")
+        if job.error:
+            raise _ArgosUnavailable(job.error)
+        if "error" in job.reply:
+            raise _ArgosUnavailable(job.reply["error"])
+        return job.reply["results"]
+
+    def queued(self) -> int:
+        return self._jobs.qsize() if self._jobs is not None else 0
+
+    def shutdown(self):
+        for worker in self._workers:
+            if worker is not None:
+                worker.stop()
+
+
+ARGOS_POOL = _ArgosWorkerPool(ARGOS_WORKERS, ARGOS_WORKER_THREADS, ARGOS_QUEUE_SIZE, ARGOS_TIMEOUT)
+
+
+def argos_ready() -> bool:
+    """هل نموذج Argos محمّل — داخل العملية، أو في أحد العمال، أو في خدمة الترجمة المشتركة."""
+    return ARGOS_TRANSLATOR.ready or ARGOS_POOL.ready or DAEMON_CLIENT.argos_ready
+
+
+def preload_argos():
+    """
+    تحميل Argos مسبقاً: مع خدمة الترجمة المشتركة يُكتفى بسؤالها عن حالتها،
+    وإلا تشغيل العمال إن كانت مفعّلة، وإلا تحميل داخل العملية.
+    """
+    if DAEMON_CLIENT.enabled:
+        threading.Thread(target=DAEMON_CLIENT.status, name="arabic-t2i-daemon-status", daemon=True).start()
+    elif ARGOS_POOL.enabled:
+        ARGOS_POOL.start()
+    else:
+        ARGOS_TRANSLATOR.preload()
+
+
+def _pool_metrics():
+    return [
+        ("arabic_t2i_argos_workers_ready", {},
+         sum(1 for w in ARGOS_POOL._workers if w is not None and w.ready)),
+        ("arabic_t2i_argos_queue_depth", {}, ARGOS_POOL.queued()),
+    ]
+
+
+METRICS.collectors.append(_pool_metrics)
 
 
 # ──────────────────────────────────────────────
@@ -249,64 +1725,794 @@ def _translate_text(text: str, engine: str) -> tuple[str, str]:
     """
     يُترجم النص العربي إلى الإنجليزية.
     يُعيد (translated_text, status_message)
+
+    النتائج الناجحة فقط تُحفظ في TRANSLATION_CACHE — الأخطاء تُعاد المحاولة لاحقاً.
     """
-    if not text.strip():
-        return ("", "⚠️ النص فارغ")
+    return translate_many([text], engine)[0]
 
-    # ── أوفلاين: Argos Translate ────────────────
-    if engine == "offline - Argos Translate (لا إنترنت)":
-        try:
-            import argostranslate.package
-            import argostranslate.translate
 
-            # تحقق هل حزمة ar→en مثبتة
-            installed = argostranslate.translate.get_installed_languages()
-            codes     = {lang.code for lang in installed}
-
-            if "ar" not in codes or "en" not in codes:
-                # تحميل الحزمة تلقائياً (مرة واحدة فقط)
-                print("📦 Argos: تحميل حزمة الترجمة ar→en ...")
-                argostranslate.package.update_package_index()
-                available = argostranslate.package.get_available_packages()
-                pkg = next(
-                    (p for p in available if p.from_code == "ar" and p.to_code == "en"),
-                    None
-                )
-                if pkg is None:
-                    return (text, "❌ Argos: حزمة ar→en غير متوفرة")
-                argostranslate.package.install_from_path(pkg.download())
-                installed = argostranslate.translate.get_installed_languages()
+GOOGLE_ENGINE = "online - Google Translate (إنترنت)"
+ARGOS_ENGINE  = "offline - Argos Translate (لا إنترنت)"
+AUTO_ENGINE   = "auto - fastest available (تلقائي)"
 
-            ar_lang = next((l for l in installed if l.code == "ar"), None)
-            en_lang = next((l for l in installed if l.code == "en"), None)
-            if ar_lang is None or en_lang is None:
-                return (text, "❌ Argos: اللغات غير متوفرة بعد التثبيت")
+_CACHED_ENGINES = {GOOGLE_ENGINE, ARGOS_ENGINE, AUTO_ENGINE}
+
+# حالة النجاح لكل محرك — منها يُعرف أي محرك أجاب فعلاً في auto
+_ENGINE_OK_STATUS = {
+    GOOGLE_ENGINE: "✅ ترجمة أونلاين (Google)",
+    ARGOS_ENGINE:  "✅ ترجمة أوفلاين (Argos)",
+}
 
-            translation = ar_lang.get_translation(en_lang)
-            result      = translation.translate(text)
-            print(f"✅ Argos Offline → {result}")
-            return (result, "✅ ترجمة أوفلاين (Argos)")
+GOOGLE_CONCURRENCY = int(os.environ.get("ARABIC_T2I_GOOGLE_CONCURRENCY", "4"))
+GOOGLE_TIMEOUT     = float(os.environ.get("ARABIC_T2I_GOOGLE_TIMEOUT", "8"))
+GOOGLE_BASE_URL    = os.environ.get("ARABIC_T2I_GOOGLE_BASE_URL", "")
+_GOOGLE_EXECUTOR   = None
+
+
+def translate_many(texts, engine: str, stats: dict = None) -> list:
+    """
+    ترجمة قائمة نصوص دفعة واحدة — يُزيل التكرار ويحافظ على الترتيب.
+    النصوص تُوحَّد أولاً (normalize_arabic): المفتاح الموحّد هو ما يُخزَّن ويُرسل للمحرك.
+    يُعيد [(translated_text, status_message), ...] بنفس ترتيب المدخلات.
 
+    stats (اختياري): يُضاف إليه عدد الأجزاء الفريدة "reused" من الذاكرة و "translated" جديداً،
+    و "glossary" للنصوص التي غطّاها قاموس المصطلحات بالكامل (بدون محرك).
+    """
+    results = [None] * len(texts)
+    pending = OrderedDict()   # مفتاح موحّد → فهارس المدخلات
+    raw     = set()
+    raw_chars = key_chars = 0
+
+    for i, text in enumerate(texts):
+        key = normalize_arabic(text) if engine in _CACHED_ENGINES else text
+        if not key.strip():
+            results[i] = ("", "⚠️ النص فارغ")
+        elif engine not in _CACHED_ENGINES:
+            results[i] = (text, "ℹ️ الترجمة معطلة")
+        else:
+            pending.setdefault(key, []).append(i)
+            if text not in raw:
+                raw.add(text)
+                raw_chars += len(text)
+                key_chars += len(key)
+
+    if raw:
+        METRICS.inc("arabic_t2i_normalize_chars_total", raw_chars, stage="raw")
+        METRICS.inc("arabic_t2i_normalize_chars_total", key_chars, stage="normalized")
+        METRICS.inc("arabic_t2i_normalize_keys_total", len(raw), stage="raw")
+        METRICS.inc("arabic_t2i_normalize_keys_total", len(pending), stage="normalized")
+
+    # قاموس المصطلحات أولاً: يُستخدم فقط إذا غطّى المقطع بالكامل، وإلا يذهب المقطع كله للذاكرة/المحرك
+    spans   = {}              # مفتاح → [(True, english), ...] أو [(False, المفتاح)]
+    lookups = OrderedDict()   # جزء مجهول → (translated, status)
+    hits = 0
+    for key in pending:
+        spans[key] = PHRASE_TABLE.split(key) if PHRASE_TABLE.enabled else [(False, key)]
+        for known, part in spans[key]:
+            hits += known
+            if not known:
+                lookups[part] = None
+    if PHRASE_TABLE.enabled and pending:
+        METRICS.inc("arabic_t2i_glossary_spans_total", hits, result="hit")
+        METRICS.inc("arabic_t2i_glossary_spans_total", len(lookups), result="miss")
+
+    # auto لا يملك ذاكرة خاصة: يقرأ ذاكرة المحرك الذي سيُجرّبه أولاً الآن
+    lookup_engine = _AUTO_ENGINES[ENGINE_ROUTER.ranked()[0]] if engine == AUTO_ENGINE else engine
+    misses = []
+    for part in lookups:
+        cached = TRANSLATION_CACHE.get(lookup_engine, part)
+        if cached is None:
+            misses.append(part)
+        else:
+            lookups[part] = cached
+
+    if stats is not None:
+        stats["reused"]     = stats.get("reused", 0) + len(lookups) - len(misses)
+        stats["translated"] = stats.get("translated", 0) + len(misses)
+        stats["glossary"]   = stats.get("glossary", 0) + sum(
+            all(known for known, _ in parts) for parts in spans.values())
+
+    if misses:
+        for part, result in zip(misses, _translate_batch_uncached(misses, engine)):
+            answered = _answered_by(engine, result[1])
+            if answered:
+                TRANSLATION_CACHE.put(answered, part, result)
+            lookups[part] = result
+
+    for key, indices in pending.items():
+        parts = spans[key]
+        if len(parts) == 1 and not parts[0][0]:
+            result = lookups[key]
+        else:
+            pieces = [(part, GLOSSARY_STATUS) if known else lookups[part] for known, part in parts]
+            engine_pieces = [lookups[part] for known, part in parts if not known]
+            result = (" ".join(t for t, _ in pieces if t),
+                      _merge_status(engine_pieces) if engine_pieces else GLOSSARY_STATUS)
+        for i in indices:
+            results[i] = result
+
+    return results
+
+
+_SEGMENT_SPLIT = re.compile(r"[,،]")
+
+
+def translate_segmented(texts, engine: str):
+    """
+    ترجمة على مستوى المقاطع: كل سطر يُقسَّم على الفواصل (, و ،)
+    ويُترجَم كل مقطع ويُحفظ منفرداً، ثم يُعاد التجميع بنفس الترتيب.
+    تعديل كلمة واحدة في برومبيت طويل يُكلّف ترجمة مقطعها فقط.
+
+    يُعيد (results, stats) حيث stats = {"reused": n, "translated": m, "glossary": k}
+    """
+    stats = {"reused": 0, "translated": 0, "glossary": 0}
+    if engine not in _CACHED_ENGINES:
+        return translate_many(texts, engine), stats
+
+    # النص → أسطر → مقاطع
+    layouts  = []
+    segments = []
+    for text in texts:
+        lines = []
+        for line in text.split("\n"):
+            pieces = [p.strip() for p in _SEGMENT_SPLIT.split(line)]
+            pieces = [p for p in pieces if p]
+            lines.append((len(segments), len(pieces)))
+            segments.extend(pieces)
+        layouts.append(lines)
+
+    translated = translate_many(segments, engine, stats)
+    METRICS.inc("arabic_t2i_segments_total", stats["reused"], result="reused")
+    METRICS.inc("arabic_t2i_segments_total", stats["translated"], result="translated")
+    METRICS.inc("arabic_t2i_segments_total", stats["glossary"], result="glossary")
+
+    results = []
+    for text, lines in zip(texts, layouts):
+        if not text.strip():
+            results.append(("", "⚠️ النص فارغ"))
+            continue
+        parts = []
+        out_lines = []
+        for start, count in lines:
+            line_parts = translated[start:start + count]
+            parts.extend(line_parts)
+            out_lines.append(", ".join(t for t, _ in line_parts if t.strip()))
+        results.append(("\n".join(out_lines).strip("\n"), _merge_status(parts)))
+    return results, stats
+
+
+def _answered_by(engine: str, status: str) -> str:
+    """
+    المحرك الذي تُحفظ تحته نتيجة ناجحة ("" = لا تُحفظ). نتائج auto تُحفظ تحت المحرك
+    الذي أجاب فعلاً — إجابة Argos الاحتياطية لا تبقى تُقدَّم كإجابة auto بعد عودة Google.
+    """
+    if not status.startswith("✅"):
+        return ""
+    if engine != AUTO_ENGINE:
+        return engine
+    for candidate, ok_status in _ENGINE_OK_STATUS.items():
+        if status == ok_status:
+            return candidate
+    return ""
+
+
+def _merge_status(results) -> str:
+    """حالة واحدة لعدة ترجمات: أول خطأ إن وُجد، وإلا أول حالة."""
+    statuses = [status for text, status in results if text]
+    for status in statuses:
+        if not status.startswith("✅"):
+            return status
+    return statuses[0] if statuses else "⚠️ النص فارغ"
+
+
+def _translate_batch_uncached(texts: list, engine: str, allow_install: bool = True) -> list:
+    """
+    الترجمة الفعلية عبر المحرك — بدون أي ذاكرة مؤقتة (مع تسجيل المقاييس وصحة المحرك).
+    allow_install=False: لا تُنزَّل حزمة Argos إن كانت ناقصة (عند اختيار auto لها).
+    """
+    if DAEMON_CLIENT.enabled:
+        start = time.perf_counter()
+        results = DAEMON_CLIENT.translate(texts, engine)
+        METRICS.inc("arabic_t2i_daemon_requests_total", result="fallback" if results is None else "ok")
+        if results is not None:
+            METRICS.observe("arabic_t2i_engine_seconds", time.perf_counter() - start, engine="daemon")
+            return results
+
+    if engine == AUTO_ENGINE:
+        return _call_auto(texts)
+
+    label = _engine_label(engine)
+    if not ENGINE_ROUTER.allow(label):
+        METRICS.inc("arabic_t2i_translations_total", len(texts), engine=label, result="breaker_open")
+        return [(text, f"❌ {label}: متوقف مؤقتاً بعد أخطاء متكررة") for text in texts]
+
+    start = time.perf_counter()
+    results = _call_engine(texts, engine, allow_install)
+    elapsed = time.perf_counter() - start
+    ok = all(status.startswith("✅") for _, status in results)
+    # زمن الطلب الواحد لا الدفعة: طلبات Google تُنفَّذ GOOGLE_CONCURRENCY في كل موجة
+    per_request = elapsed / _google_waves(len(texts)) if engine == GOOGLE_ENGINE else elapsed
+    ENGINE_ROUTER.record(label, ok, per_request)
+    METRICS.observe("arabic_t2i_engine_seconds", elapsed, engine=label)
+    for _, status in results:
+        METRICS.inc("arabic_t2i_translations_total", engine=label,
+                    result="ok" if status.startswith("✅") else "error")
+    return results
+
+
+def _call_engine(texts: list, engine: str, allow_install: bool = True) -> list:
+    """نداء المحرك المختار — يُعيد [(translated, status), ...]."""
+    # ── أوفلاين: Argos Translate ────────────────
+    if engine == ARGOS_ENGINE:
+        try:
+            if ARGOS_POOL.enabled:
+                results = _argos_pool_translate(texts, allow_install)
+            else:
+                results = _argos_translate_batch(ARGOS_TRANSLATOR.get(allow_install), texts)
+            for result in results:
+                _log(f"✅ Argos Offline → {result}")
+            return [(result, _ENGINE_OK_STATUS[ARGOS_ENGINE]) for result in results]
+
+        except _ArgosUnavailable as e:
+            return [(text, str(e)) for text in texts]
         except ImportError:
-            return (text, "❌ argostranslate غير مثبتة — نفّذ: pip install argostranslate")
+            return [(text, "❌ argostranslate غير مثبتة — نفّذ: pip install argostranslate")
+                    for text in texts]
         except Exception as e:
-            return (text, f"❌ Argos خطأ: {e}")
+            return [(text, f"❌ Argos خطأ: {e}") for text in texts]
 
-    # ── أونلاين: deep-translator (Google) ───────
-    elif engine == "online - Google Translate (إنترنت)":
+    # ── أونلاين: Google (صفحة translate.google.com/m) ───────
+    elif engine == GOOGLE_ENGINE:
         try:
-            from deep_translator import GoogleTranslator
-            result = GoogleTranslator(source="auto", target="en").translate(text)
-            print(f"✅ Google → {result}")
-            return (result, "✅ ترجمة أونلاين (Google)")
+            _google_session()
         except ImportError:
-            return (text, "❌ deep-translator غير مثبتة — نفّذ: pip install deep-translator")
-        except Exception as e:
-            return (text, f"❌ Google خطأ: {e}")
+            return [(text, "❌ requests غير مثبتة — نفّذ: pip install requests")
+                    for text in texts]
+
+        def one(text):
+            try:
+                result = _google_translate_text(text)
+                _log(f"✅ Google → {result}")
+                return (result, _ENGINE_OK_STATUS[GOOGLE_ENGINE])
+            except Exception as e:
+                if type(e).__name__.endswith("Timeout"):   # requests ReadTimeout / ConnectTimeout
+                    return (text, f"❌ Google: انتهت المهلة ({GOOGLE_TIMEOUT:g}s)")
+                return (text, f"❌ Google خطأ: {e}")
+
+        # مهلة كل طلب تبدأ مع الطلب نفسه (مهلة المقبس في _google_translate_text) — لا يُحسب وقت
+        # الانتظار في الطابور. الحد هنا احتياطي فقط: موجة لكل GOOGLE_CONCURRENCY طلبات + موجة.
+        from concurrent.futures import wait
+        futures = [_google_executor().submit(one, text) for text in texts]
+        done, late = wait(futures, timeout=GOOGLE_TIMEOUT * (_google_waves(len(texts)) + 1))
+        for future in late:
+            future.cancel()
+        return [
+            future.result() if future in done else (text, f"❌ Google: انتهت المهلة ({GOOGLE_TIMEOUT:g}s)")
+            for text, future in zip(texts, futures)
+        ]
 
     # ── بدون ترجمة ──────────────────────────────
     else:
-        return (text, "ℹ️ الترجمة معطلة")
+        return [(text, "ℹ️ الترجمة معطلة") for text in texts]
+
+
+_ARGOS_BATCHING = True   # يُطفأ نهائياً عند أول فشل للدفعة الواحدة
+
+
+def _argos_translate_batch(translation, texts: list) -> list:
+    """
+    دفعة Argos حقيقية: جمل كل النصوص تُرسل في نداء translate_batch واحد لمترجم
+    ctranslate2 الخاص بالحزمة (argostranslate نفسها تترجم كل فقرة بنداء منفصل).
+    يعتمد على أجزاء داخلية من argostranslate (1.11): إذا لم تتوفر أو فشلت الدفعة
+    مرة يُترجم كل نص وحده لبقية عمر العملية.
+    """
+    global _ARGOS_BATCHING
+    package_translation = getattr(translation, "underlying", translation)   # CachedTranslation
+    if _ARGOS_BATCHING and not all(
+        hasattr(package_translation, name) for name in ("pkg", "sentencizer", "translator")
+    ):
+        _ARGOS_BATCHING = False
+        _log("ℹ️ Argos: نسخة argostranslate لا تدعم الدفعة الواحدة — ترجمة كل نص وحده")
+    if len(texts) < 2 or not _ARGOS_BATCHING:
+        return [translation.translate(text) for text in texts]
+
+    results = []
+    if package_translation.translator is None:
+        # أول نداء يبني مترجم ctranslate2 بإعدادات argostranslate نفسها
+        results.append(translation.translate(texts[0]))
+        texts = texts[1:]
+    try:
+        return results + _argos_ctranslate_batch(package_translation, texts)
+    except Exception as e:
+        _ARGOS_BATCHING = False
+        print(f"⚠️ Arabic T2I: Argos: تعذّرت الدفعة الواحدة ({e}) — ترجمة كل نص وحده من الآن")
+        return results + [translation.translate(text) for text in texts]
+
+
+def _argos_ctranslate_batch(package_translation, texts: list) -> list:
+    """تقسيم فقرات → جمل → رموز، نداء translate_batch واحد، ثم إعادة التجميع لكل نص."""
+    from argostranslate import settings
+
+    pkg        = package_translation.pkg
+    prefix     = getattr(pkg, "target_prefix", "") or ""
+    tokenized  = []
+    paragraphs = []   # لكل نص: [(أول جملة، عدد الجمل) لكل فقرة]
+    for text in texts:
+        layout = []
+        for paragraph in text.split("\n"):
+            sentences = package_translation.sentencizer.split_sentences(paragraph) if paragraph.strip() else []
+            layout.append((len(tokenized), len(sentences)))
+            tokenized.extend(pkg.tokenizer.encode(sentence) for sentence in sentences)
+        paragraphs.append(layout)
+
+    batches = package_translation.translator.translate_batch(
+        tokenized,
+        target_prefix=[[prefix]] * len(tokenized) if prefix else None,
+        replace_unknowns=True,
+        max_batch_size=getattr(settings, "batch_size", 32),   # افتراضيات argostranslate
+        batch_type="tokens",
+        beam_size=max(1, getattr(settings, "beam_size", 4)),
+        num_hypotheses=1,
+        length_penalty=0.2,
+    ) if tokenized else []
+
+    results = []
+    for layout in paragraphs:
+        lines = []
+        for start, count in layout:
+            tokens = [token for batch in batches[start:start + count] for token in batch.hypotheses[0]]
+            value  = pkg.tokenizer.decode(tokens) if tokens else ""
+            if prefix and value.startswith(prefix):
+                value = value[len(prefix):]
+            lines.append(value[1:] if value.startswith(" ") else value)
+        results.append("\n".join(lines))
+    return results
+
+
+def _argos_pool_translate(texts: list, allow_install: bool = True) -> list:
+    """
+    الترجمة عبر ARGOS_POOL. العمال لا يُثبّتون حزماً — إذا كانت ar→en ناقصة
+    تُثبَّت مرة هنا ثم يُعاد الطلب (العامل يعيد البحث عن النموذج عند كل طلب فاشل).
+    """
+    try:
+        return ARGOS_POOL.translate(texts)
+    except _ArgosUnavailable as e:
+        if str(e) != _ARGOS_MISSING or not allow_install:
+            raise
+    _ArgosTranslator._resolve(allow_install=True)
+    return ARGOS_POOL.translate(texts)
+
+
+_GOOGLE_LOCAL = threading.local()
+
+
+_GOOGLE_URL    = "https://translate.google.com/m"
+_GOOGLE_RESULT = re.compile(r'<div[^>]*class="(?:t0|result-container)"[^>]*>(.*?)</div>', re.S)
+_GOOGLE_MAX_CHARS = 5000
+
+
+def _google_session():
+    """
+    جلسة requests لكل خيط (اتصالات دائمة). نطلب صفحة translate.google.com/m مباشرة
+    بدل deep-translator لأنه لا يمرر timeout — الطلب المعلّق كان يحجز خيطاً إلى الأبد.
+    """
+    session = getattr(_GOOGLE_LOCAL, "session", None)
+    if session is None:
+        import requests
+        session = _GOOGLE_LOCAL.session = requests.Session()
+    return session
+
+
+def _google_translate_text(text: str) -> str:
+    """ترجمة نص واحد عبر صفحة Google المحمولة — مهلة مقبس GOOGLE_TIMEOUT للطلب نفسه."""
+    import html
+    text = text.strip()
+    if len(text) > _GOOGLE_MAX_CHARS:
+        raise ValueError(f"النص أطول من {_GOOGLE_MAX_CHARS} حرف")
+    response = _google_session().get(
+        GOOGLE_BASE_URL or _GOOGLE_URL,
+        params={"sl": "auto", "tl": "en", "q": text},
+        timeout=GOOGLE_TIMEOUT,
+    )
+    try:
+        if response.status_code == 429:
+            raise RuntimeError("طلبات كثيرة (429)")
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        match = _GOOGLE_RESULT.search(response.text)
+        if match is None:
+            raise RuntimeError("لا توجد ترجمة في الرد")
+        return html.unescape(re.sub(r"<[^>]+>", "", match.group(1))).strip()
+    finally:
+        response.close()
+
+
+def _google_waves(count: int) -> int:
+    """عدد موجات الطلبات المتوازية لدفعة Google من count نص."""
+    return max(1, -(-count // max(1, GOOGLE_CONCURRENCY)))
+
+
+def _google_executor():
+    global _GOOGLE_EXECUTOR
+    if _GOOGLE_EXECUTOR is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _GOOGLE_EXECUTOR = ThreadPoolExecutor(
+            max_workers=max(1, GOOGLE_CONCURRENCY),
+            thread_name_prefix="arabic-t2i-google",
+        )
+    return _GOOGLE_EXECUTOR
+
+
+# ──────────────────────────────────────────────
+#  ENGINE ROUTER  (auto: latency, breaker, hedging)
+# ──────────────────────────────────────────────
+AUTO_DEADLINE     = float(os.environ.get("ARABIC_T2I_AUTO_DEADLINE", "10"))
+AUTO_HEDGE_MS     = float(os.environ.get("ARABIC_T2I_AUTO_HEDGE_MS", "1500"))   # 0 = بدون تحوّط
+BREAKER_FAILURES  = int(os.environ.get("ARABIC_T2I_BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN  = float(os.environ.get("ARABIC_T2I_BREAKER_COOLDOWN", "30"))
+
+# ترتيب التفضيل عند التعادل: Google أولاً (جودة أعلى)، ثم Argos
+_AUTO_ENGINES = {"google": GOOGLE_ENGINE, "argos": ARGOS_ENGINE}
+_AUTO_EXECUTOR = None
+
+
+class _EngineHealth:
+    __slots__ = ("latency", "error_rate", "failures", "open_until", "probing")
+
+    def __init__(self):
+        self.latency    = None   # EWMA بالثواني
+        self.error_rate = 0.0    # EWMA بين 0 و 1
+        self.failures   = 0      # أخطاء متتالية
+        self.open_until = 0.0    # 0 = القاطع مغلق
+        self.probing    = False
+
+
+class EngineRouter:
+    """
+    صحة كل محرك: متوسط زمن متحرك (EWMA)، نسبة أخطاء، وقاطع دائرة
+    Per-engine EWMA latency / error rate plus a circuit breaker.
+
+    - بعد BREAKER_FAILURES أخطاء متتالية يُفتح القاطع BREAKER_COOLDOWN ثانية:
+      الطلبات تفشل فوراً بدل انتظار مهلة الشبكة.
+    - بعد التبريد يُسمح بطلب تجريبي واحد (half-open): نجاحه يغلق القاطع وفشله يعيد فتحه.
+    """
+
+    ALPHA = 0.2
+
+    def __init__(self, engines, failures: int, cooldown: float):
+        self._lock    = threading.Lock()
+        self.failures = max(1, failures)
+        self.cooldown = cooldown
+        self._health  = {label: _EngineHealth() for label in engines}
+
+    def allow(self, label: str) -> bool:
+        health = self._health.get(label)
+        if health is None:
+            return True
+        with self._lock:
+            if not health.open_until:
+                return True
+            if time.monotonic() < health.open_until or health.probing:
+                return False
+            health.probing = True
+            return True
+
+    def record(self, label: str, ok: bool, seconds: float):
+        health = self._health.get(label)
+        if health is None:
+            return
+        with self._lock:
+            health.latency = seconds if health.latency is None else \
+                health.latency + self.ALPHA * (seconds - health.latency)
+            health.error_rate += self.ALPHA * ((0.0 if ok else 1.0) - health.error_rate)
+            health.probing = False
+            if ok:
+                health.failures, health.open_until = 0, 0.0
+                return
+            health.failures += 1
+            if health.failures >= self.failures or health.open_until:
+                if not health.open_until:
+                    print(f"⚠️ Arabic T2I: {label}: {health.failures} أخطاء متتالية — إيقاف مؤقت {self.cooldown:g}s")
+                health.open_until = time.monotonic() + self.cooldown
+
+    def ranked(self) -> list:
+        """
+        المحركات بالتكلفة المتوقعة (الزمن ÷ نسبة النجاح)، ثم غير المقاسة بترتيب
+        التفضيل (لا تُعتبر مجانية)، والمتوقفة في الآخر.
+        """
+        now = time.monotonic()
+        scored = []
+        with self._lock:
+            for order, (label, health) in enumerate(self._health.items()):
+                blocked  = bool(health.open_until) and (now < health.open_until or health.probing)
+                untested = health.latency is None
+                cost     = (health.latency or 0.0) / max(0.05, 1.0 - health.error_rate)
+                scored.append((blocked, untested, cost, order, label))
+        return [label for *_, label in sorted(scored)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                label: {
+                    "latency":      health.latency or 0.0,
+                    "error_rate":   health.error_rate,
+                    "breaker_open": int(bool(health.open_until)),
+                }
+                for label, health in self._health.items()
+            }
+
+
+ENGINE_ROUTER = EngineRouter(_AUTO_ENGINES, BREAKER_FAILURES, BREAKER_COOLDOWN)
+
+
+def _auto_executor():
+    global _AUTO_EXECUTOR
+    if _AUTO_EXECUTOR is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _AUTO_EXECUTOR = ThreadPoolExecutor(
+            max_workers=2 * max(1, GOOGLE_CONCURRENCY),
+            thread_name_prefix="arabic-t2i-auto",
+        )
+    return _AUTO_EXECUTOR
+
+
+def _call_auto(texts: list) -> list:
+    """
+    المحرك التلقائي: يبدأ بالأقل تكلفة حسب ENGINE_ROUTER. إذا لم يُجب خلال
+    AUTO_HEDGE_MS يُطلق المحرك التالي بالتوازي وتُؤخذ أول نتيجة ناجحة؛
+    الخطأ ينقل للمحرك التالي فوراً. المهلة الكلية AUTO_DEADLINE.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    deadline = time.monotonic() + AUTO_DEADLINE
+    waiting  = ENGINE_ROUTER.ranked()
+    running  = {}   # future → (label, route)
+    last     = None
+
+    def launch(route):
+        label = waiting.pop(0)
+        # auto لا يُنزّل نموذج Argos أثناء التوليد — التثبيت فقط عند اختيار Argos صراحة
+        future = _auto_executor().submit(_translate_batch_uncached, texts, _AUTO_ENGINES[label], False)
+        running[future] = (label, route)
+
+    launch("primary")
+    while running:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        hedge = bool(waiting) and AUTO_HEDGE_MS > 0
+        done, _ = wait(running, timeout=min(remaining, AUTO_HEDGE_MS / 1000) if hedge else remaining,
+                       return_when=FIRST_COMPLETED)
+        for future in done:
+            label, route = running.pop(future)
+            results = future.result()
+            if all(status.startswith("✅") for _, status in results):
+                METRICS.inc("arabic_t2i_auto_routes_total", engine=label, route=route)
+                return results
+            last = results
+        if waiting and (done or hedge):
+            launch("fallback" if done else "hedge")
+
+    return last or [(text, f"❌ auto: انتهت المهلة ({AUTO_DEADLINE:g}s)") for text in texts]
+
+
+def _router_metrics():
+    samples = []
+    for label, health in ENGINE_ROUTER.stats().items():
+        samples += [
+            ("arabic_t2i_engine_ewma_seconds",  {"engine": label}, health["latency"]),
+            ("arabic_t2i_engine_error_rate",    {"engine": label}, health["error_rate"]),
+            ("arabic_t2i_engine_breaker_open",  {"engine": label}, health["breaker_open"]),
+        ]
+    return samples
+
+
+METRICS.collectors.append(_router_metrics)
+
+
+# ──────────────────────────────────────────────
+#  TRANSLATION DAEMON CLIENT  (shared per host)
+# ──────────────────────────────────────────────
+TRANSLATE_DAEMON = os.environ.get("ARABIC_T2I_TRANSLATE_DAEMON", "")   # unix:/path.sock أو host:port
+DAEMON_TIMEOUT   = float(os.environ.get("ARABIC_T2I_DAEMON_TIMEOUT", "30"))
+_DAEMON_RETRY_S  = 5.0
+
+
+def parse_daemon_address(value: str) -> tuple:
+    """
+    "unix:/tmp/t.sock" أو "/tmp/t.sock" → ("unix", path)
+    "127.0.0.1:8799" أو "8799"          → ("tcp", (host, port))
+    """
+    value = value.strip()
+    if value.startswith("unix:"):
+        return "unix", value[len("unix:"):]
+    if "/" in value:
+        return "unix", value
+    host, _, port = value.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+class TranslationDaemonClient:
+    """
+    عميل خدمة الترجمة المشتركة (arabic_translate_daemon.py)
+    Keeps persistent connections to the daemon; one JSON line per request and reply.
+
+    أي خطأ اتصال يُعيد None فيترجم المستدعي داخل العملية، ولا يُعاد الاتصال
+    قبل _DAEMON_RETRY_S ثوانٍ حتى لا تدفع كل ترجمة ثمن مهلة الاتصال.
+    """
+
+    def __init__(self, address: str, timeout: float):
+        self.address     = parse_daemon_address(address) if address else None
+        self.timeout     = timeout
+        self.argos_ready = False
+        self._idle       = []   # اتصالات جاهزة لإعادة الاستخدام: (socket, reader)
+        self._lock       = threading.Lock()
+        self._next_id    = 0
+        self._down_until = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.address is not None
+
+    def _connect(self):
+        import socket
+        family, address = self.address
+        if family == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock, sock.makefile("rb")
+
+    @staticmethod
+    def _close(conn):
+        sock, reader = conn
+        reader.close()
+        sock.close()
+
+    def _exchange(self, conn, message: dict) -> dict:
+        import json
+        sock, reader = conn
+        sock.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("daemon closed the connection")
+        return json.loads(line)
+
+    def request(self, message: dict):
+        """يرسل طلباً ويُعيد الرد، أو None إذا تعذّر الوصول للخدمة."""
+        if time.monotonic() < self._down_until:
+            return None
+        with self._lock:
+            self._next_id += 1
+            message = {"id": self._next_id, **message}
+            conn = self._idle.pop() if self._idle else None
+
+        # اتصال معاد استخدامه قد يكون انقطع (إعادة تشغيل الخدمة) — محاولة ثانية باتصال جديد
+        for reused in ((True, False) if conn is not None else (False,)):
+            try:
+                if not reused:
+                    conn = self._connect()
+                reply = self._exchange(conn, message)
+                break
+            except (OSError, ValueError) as e:
+                if conn is not None:
+                    self._close(conn)
+                    conn = None
+                if not reused:
+                    self._down_until = time.monotonic() + _DAEMON_RETRY_S
+                    print(f"⚠️ Arabic T2I: خدمة الترجمة غير متاحة ({e}) — ترجمة داخل العملية")
+                    return None
+
+        with self._lock:
+            self._idle.append(conn)
+        self.argos_ready = bool(reply.get("argos_ready"))
+        return reply
+
+    def translate(self, texts: list, engine: str):
+        reply = self.request({"engine": engine, "texts": texts})
+        if reply is None or "results" not in reply:
+            return None
+        return [tuple(result) for result in reply["results"]]
+
+    def status(self):
+        return self.request({"op": "status"})
+
+
+DAEMON_CLIENT = TranslationDaemonClient(TRANSLATE_DAEMON, DAEMON_TIMEOUT)
+
+
+# ──────────────────────────────────────────────
+#  CLIP CONDITIONING CACHE
+# ──────────────────────────────────────────────
+COND_CACHE_MB  = float(os.environ.get("ARABIC_T2I_COND_CACHE_MB", "256"))
+COND_CACHE_CPU = os.environ.get("ARABIC_T2I_COND_CACHE_CPU", "0") == "1"
+
+
+def _tensor_bytes(t) -> int:
+    return 0 if t is None else t.element_size() * t.nelement()
+
+
+class ConditioningCache:
+    """
+    ذاكرة LRU لنتائج ترميز CLIP — مفتاحها (هوية كائن CLIP، النص المترجم)
+    LRU of [[cond, {"pooled_output": pooled}]] bounded by tensor bytes.
+
+    في تجارب تغيير الـ seed فقط يبقى النص و CLIP كما هما،
+    فيُستغنى عن تمريرتَي ترميز النص لكل صورة.
+    كائن CLIP محفوظ بـ weakref: لا يُبقي النموذج حياً، ولا يُخلط بكائن جديد بنفس id.
+    """
+
+    def __init__(self, budget_mb: float, keep_on_cpu: bool):
+        self.budget_bytes = int(max(0.0, budget_mb) * 1024 * 1024)
+        self.keep_on_cpu  = keep_on_cpu
+        self._entries     = OrderedDict()   # key → (clip_ref, cond, pooled, nbytes)
+        self._lock        = threading.Lock()
+        self.total_bytes  = 0
+        self.hits         = 0
+        self.misses       = 0
+
+    def encode(self, clip, text: str):
+        key = (id(clip), text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is clip:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return [[entry[1], {"pooled_output": entry[2]}]]
+            self.misses += 1
+
+        tokens = clip.tokenize(text)
+        cond, pooled = clip.encode_from_tokens(tokens, return_pooled=True)
+        if self.keep_on_cpu:
+            cond   = cond.to("cpu")
+            pooled = pooled.to("cpu") if pooled is not None else None
+
+        self._store(key, clip, cond, pooled)
+        return [[cond, {"pooled_output": pooled}]]
+
+    def _store(self, key, clip, cond, pooled):
+        nbytes = _tensor_bytes(cond) + _tensor_bytes(pooled)
+        if nbytes > self.budget_bytes:
+            return
+        try:
+            clip_ref = weakref.ref(clip)
+        except TypeError:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[3]
+            self._entries[key] = (clip_ref, cond, pooled, nbytes)
+            self.total_bytes  += nbytes
+            while self.total_bytes > self.budget_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries":      len(self._entries),
+                "bytes":        self.total_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits":         self.hits,
+                "misses":       self.misses,
+            }
+
+
+COND_CACHE = ConditioningCache(COND_CACHE_MB, COND_CACHE_CPU)
 
 
 # ──────────────────────────────────────────────
@@ -315,7 +2521,7 @@ def _translate_text(text: str, engine: str) -> tuple[str, str]:
 class ArabicPromptBuilderNode:
     """
     مساعد بناء البرومبيت الاحترافي
-    • ترجمة أونلاين  → Google Translate (deep-translator)
+    • ترجمة أونلاين  → Google Translate
     • ترجمة أوفلاين → Argos Translate  (بدون إنترنت)
     • معاينة حية للنص المترجم داخل العقدة عبر JavaScript
     """
@@ -332,6 +2538,7 @@ class ArabicPromptBuilderNode:
     TRANSLATION_ENGINES = [
         "online - Google Translate (إنترنت)",
         "offline - Argos Translate (لا إنترنت)",
+        "auto - fastest available (تلقائي)",
         "disable - no translation (بدون ترجمة)",
     ]
 
@@ -345,9 +2552,9 @@ class ArabicPromptBuilderNode:
                     "tooltip":   "الموضوع الرئيسي — يُترجم تلقائياً",
                 }),
                 "environment": ("STRING", {
-                    "multiline": False,
+                    "multiline": True,
                     "default":   "غروب الشمس، نخل، رمال ذهبية",
-                    "tooltip":   "البيئة والخلفية — يُترجم تلقائياً",
+                    "tooltip":   "البيئة والخلفية — يُترجم تلقائياً (سطر لكل بيئة في وضع القائمة)",
                 }),
                 "style_quality": (list(cls.QUALITY_TAGS.keys()), {
                     "default": "Ultra Quality (جودة فائقة)",
@@ -367,13 +2574,33 @@ class ArabicPromptBuilderNode:
                     "default":   "← سيظهر النص المترجم هنا تلقائياً",
                     "tooltip":   "معاينة فورية للنص بعد الترجمة (للقراءة فقط)",
                 }),
-            }
+            },
+            "optional": {
+                # ── وضع القائمة (شبكة برومبيتات) ──────────────
+                "list_mode": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "كل سطر في الموضوع/البيئة/الأساليب عنصر مستقل — "
+                               "المخرج كل التركيبات (موضوع × بيئة × أسلوب)",
+                }),
+                "style_list": ("STRING", {
+                    "multiline": True,
+                    "default":   "",
+                    "tooltip":   "أساليب وضع القائمة، سطر لكل أسلوب: اسم من style_quality "
+                                 "(مثل Cinematic) أو كلمات إنجليزية مباشرة — فارغ = style_quality",
+                }),
+                "max_prompts": ("INT", {
+                    "default": 256, "min": 1, "max": 4096,
+                    "tooltip": "حد أقصى لعدد التركيبات في وضع القائمة",
+                }),
+            },
         }
 
-    RETURN_TYPES  = ("STRING", "STRING", "STRING")
-    RETURN_NAMES  = ("prompt_output", "original_arabic", "translation_status")
-    FUNCTION      = "build"
-    CATEGORY      = "🎨 Arabic Nodes/Text to Image"
+    RETURN_TYPES   = ("STRING", "STRING", "STRING", "STRING")
+    RETURN_NAMES   = ("prompt_output", "original_arabic", "translation_status", "prompt_list")
+    # prompt_list: العقد التالية تُنفَّذ مرة لكل برومبيت — prompt_output سطر لكل برومبيت (لـ prompt_variants)
+    OUTPUT_IS_LIST = (False, False, False, True)
+    FUNCTION       = "build"
+    CATEGORY       = "🎨 Arabic Nodes/Text to Image"
 
     # ── دالة البناء الرئيسية ──────────────────────
     def build(
@@ -381,29 +2608,94 @@ class ArabicPromptBuilderNode:
         subject, environment,
         style_quality, translation_engine,
         extra_tags, translated_preview,
+        list_mode=False, style_list="", max_prompts=256,
     ):
+        if list_mode:
+            return self._build_list(subject, environment, style_quality, translation_engine,
+                                    extra_tags, style_list, max_prompts)
+
         quality_tag   = self.QUALITY_TAGS[style_quality]
         arabic_parts  = [p.strip() for p in [subject, environment] if p.strip()]
         combined_arabic = ", ".join(arabic_parts)
 
-        print(f"\n{'─'*50}")
-        print(f"  ✍️  Arabic Prompt Builder v2")
-        print(f"  📝 النص العربي: {combined_arabic}")
-        print(f"  ⚙️  المحرك: {translation_engine}")
-
-        # الترجمة
-        translated, status = _translate_text(combined_arabic, translation_engine)
+        # الترجمة (الموضوع والبيئة دفعة واحدة، على مستوى المقاطع)
+        with METRICS.timer("translate"):
+            results, seg_stats = translate_segmented(arabic_parts, translation_engine)
+        translated = ", ".join(text for text, _ in results if text.strip())
+        status     = _merge_status(results)
 
         # بناء البرومبيت النهائي
         parts = [p for p in [translated, quality_tag, extra_tags] if p.strip()]
         final_prompt = ", ".join(parts)
 
-        print(f"  🌐 الترجمة: {translated}")
-        print(f"  🚀 البرومبيت النهائي: {final_prompt}")
-        print(f"  {status}")
-        print(f"{'─'*50}\n")
+        _log(
+            f"\n{'─'*50}",
+            f"  ✍️  Arabic Prompt Builder v2",
+            f"  📝 النص العربي: {combined_arabic}",
+            f"  ⚙️  المحرك: {translation_engine}",
+            f"  🌐 الترجمة: {translated}",
+            f"  🚀 البرومبيت النهائي: {final_prompt}",
+            f"  {status}",
+            f"  🧩 مقاطع: {seg_stats['reused']} من الذاكرة | {seg_stats['translated']} جديدة",
+            f"{'─'*50}\n",
+        )
+
+        return (final_prompt, combined_arabic, status, [final_prompt])
+
+    # ── وضع القائمة: كل التركيبات بترجمة واحدة لكل حقل فريد ──
+    def _build_list(
+        self,
+        subject, environment,
+        style_quality, translation_engine,
+        extra_tags, style_list, max_prompts,
+    ):
+        import itertools
 
-        return (final_prompt, combined_arabic, status)
+        # الأسطر المكررة تُحذف — كل تركيبة تظهر مرة واحدة
+        subjects     = list(dict.fromkeys(_split_lines(subject))) or [""]
+        environments = list(dict.fromkeys(_split_lines(environment))) or [""]
+        styles       = list(dict.fromkeys(self._style_tags(s) for s in _split_lines(style_list))) \
+            or [self.QUALITY_TAGS[style_quality]]
+
+        # كل حقل فريد يُترجم مرة واحدة (ويُحفظ على مستوى المقاطع) مهما تكرر في الشبكة
+        fields = list(dict.fromkeys(f for f in subjects + environments if f))
+        with METRICS.timer("translate"):
+            results, seg_stats = translate_segmented(fields, translation_engine)
+        translated = {f: text for f, (text, _) in zip(fields, results)}
+        status     = _merge_status(results)
+
+        prompts, originals = [], []
+        total = len(subjects) * len(environments) * len(styles)
+        for subj, env, style in itertools.islice(
+            itertools.product(subjects, environments, styles), max_prompts,
+        ):
+            arabic  = [f for f in (subj, env) if f]
+            english = ", ".join(translated[f] for f in arabic if translated[f].strip())
+            prompts.append(", ".join(p for p in [english, style, extra_tags] if p.strip()))
+            originals.append(", ".join(arabic))
+        if total > len(prompts):
+            status += f" | ⚠️ {len(prompts)} من {total} تركيبة (max_prompts)"
+
+        _log(
+            f"\n{'─'*50}",
+            f"  ✍️  Arabic Prompt Builder v2 — وضع القائمة",
+            f"  🔢 {len(subjects)} موضوع × {len(environments)} بيئة × {len(styles)} أسلوب = {len(prompts)} برومبيت",
+            f"  ⚙️  المحرك: {translation_engine}",
+            f"  {status}",
+            f"  🧩 حقول: {len(fields)} فريدة | مقاطع: {seg_stats['reused']} من الذاكرة | {seg_stats['translated']} جديدة",
+            f"{'─'*50}\n",
+        )
+
+        return ("\n".join(prompts), "\n".join(originals), status, prompts)
+
+    @classmethod
+    def _style_tags(cls, name: str) -> str:
+        """سطر أسلوب → كلمات الجودة: الاسم الكامل أو الإنجليزي أو العربي، وإلا السطر نفسه."""
+        for key, tags in cls.QUALITY_TAGS.items():
+            english, _, arabic = key.partition(" (")
+            if name.lower() in (key.lower(), english.lower(), arabic.rstrip(")")):
+                return tags
+        return name
 
     @classmethod
     def IS_CHANGED(cls, subject, environment, translation_engine, **kwargs):
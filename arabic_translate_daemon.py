@@ -0,0 +1,158 @@
+"""
+ComfyUI - Arabic Text to Image: Shared Translation Daemon
+خدمة ترجمة مشتركة لعدة عمليات ComfyUI على نفس الجهاز
+
+نموذج Argos واحد دافئ + ذاكرة ترجمة واحدة لكل الجهاز بدل نسخة في كل عملية.
+الخدمة تستخدم نفس منطق العقدة (التوحيد، قاموس المصطلحات، الذاكرة، المحركات،
+المحرك التلقائي) — العملاء يرسلون فقط ما لم يجدوه في ذاكرتهم المحلية.
+
+البروتوكول: JSON سطر لكل رسالة، اتصالات دائمة (طلب واحد جارٍ لكل اتصال):
+  ← {"id": 1, "engine": "...", "texts": ["...", "..."]}
+  → {"id": 1, "results": [["translated", "status"], ...], "argos_ready": true}
+  ← {"id": 2, "op": "status"}
+  → {"id": 2, "argos_ready": true, "cache": {...}, "batches": n, "texts": m}
+
+الطلبات المتزامنة لنفس المحرك تُجمع خلال --batch-window-ms في نداء translate_many
+واحد (إزالة تكرار بين العمليات + دفعة واحدة للمحرك).
+
+الاستخدام:
+  python arabic_translate_daemon.py --listen unix:/tmp/arabic_t2i.sock
+  python arabic_translate_daemon.py --listen 127.0.0.1:8799
+  # ثم في كل عملية ComfyUI:
+  ARABIC_T2I_TRANSLATE_DAEMON=unix:/tmp/arabic_t2i.sock
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _Batcher:
+    """يجمع الطلبات المتزامنة لكل محرك في نداء translate_many واحد."""
+
+    def __init__(self, node, executor, window_s: float, max_texts: int):
+        self.node      = node
+        self.executor  = executor
+        self.window_s  = window_s
+        self.max_texts = max(1, max_texts)
+        self.batches   = 0
+        self.texts     = 0
+        self._pending  = {}   # engine → [(texts, future), ...]
+
+    async def translate(self, engine: str, texts: list) -> list:
+        loop    = asyncio.get_running_loop()
+        future  = loop.create_future()
+        pending = self._pending.setdefault(engine, [])
+        pending.append((texts, future))
+        if len(pending) == 1:
+            loop.call_later(self.window_s, self._flush, engine, pending)
+        if sum(len(t) for t, _ in pending) >= self.max_texts:
+            self._flush(engine, pending)
+        return await future
+
+    def _flush(self, engine: str, pending: list):
+        if self._pending.get(engine) is not pending:
+            return   # أُرسلت هذه الدفعة مسبقاً
+        del self._pending[engine]
+
+        merged = [text for texts, _ in pending for text in texts]
+        self.batches += 1
+        self.texts   += len(merged)
+        job = asyncio.get_running_loop().run_in_executor(
+            self.executor, self.node.translate_many, merged, engine,
+        )
+
+        def distribute(job):
+            error   = job.exception()
+            results = None if error else job.result()
+            offset  = 0
+            for texts, future in pending:
+                part    = results[offset:offset + len(texts)] if results else None
+                offset += len(texts)
+                if future.done():
+                    continue   # انقطع اتصال صاحب الطلب
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(part)
+
+        job.add_done_callback(distribute)
+
+
+async def _serve_connection(node, batcher, reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            reply = {"id": None}
+            try:
+                request = json.loads(line)
+                reply["id"] = request.get("id")
+                if request.get("op") == "status":
+                    reply.update(cache=node.TRANSLATION_CACHE.stats(),
+                                 batches=batcher.batches, texts=batcher.texts)
+                else:
+                    texts = [str(text) for text in request.get("texts", [])]
+                    reply["results"] = await batcher.translate(request.get("engine", ""), texts)
+            except Exception as e:
+                reply["error"] = str(e)
+            reply["argos_ready"] = node.argos_ready()
+            writer.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _run(node, args):
+    executor = ThreadPoolExecutor(max_workers=max(1, args.threads), thread_name_prefix="arabic-t2i-daemon")
+    batcher  = _Batcher(node, executor, args.batch_window_ms / 1000.0, args.max_batch)
+
+    def handler(reader, writer):
+        return _serve_connection(node, batcher, reader, writer)
+
+    family, address = node.parse_daemon_address(args.listen)
+    if family == "unix":
+        if os.path.exists(address):
+            os.unlink(address)   # مقبس قديم من تشغيل سابق
+        server = await asyncio.start_unix_server(handler, path=address)
+    else:
+        server = await asyncio.start_server(handler, host=address[0], port=address[1])
+
+    print(f"🌐 Arabic T2I translation daemon: {args.listen} "
+          f"(threads={args.threads}, batch window={args.batch_window_ms:g}ms)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared Arabic→English translation daemon")
+    parser.add_argument("--listen", default=os.environ.get("ARABIC_T2I_TRANSLATE_DAEMON") or "127.0.0.1:8799",
+                        help="unix:/path.sock أو host:port")
+    parser.add_argument("--threads", type=int, default=8, help="خيوط الترجمة المتوازية")
+    parser.add_argument("--batch-window-ms", type=float, default=5.0,
+                        help="مدة تجميع الطلبات المتزامنة قبل نداء المحرك")
+    parser.add_argument("--max-batch", type=int, default=64, help="أقصى عدد نصوص في دفعة واحدة")
+    parser.add_argument("--no-preload", action="store_true", help="لا تحمّل نموذج Argos عند البدء")
+    args = parser.parse_args(argv)
+
+    # الخدمة نفسها تترجم داخل عمليتها — لا تُحوّل إلى خدمة أخرى
+    os.environ["ARABIC_T2I_TRANSLATE_DAEMON"] = ""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import arabic_text_to_image_node as node
+
+    if not args.no_preload:
+        node.preload_argos()
+    try:
+        asyncio.run(_run(node, args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+ComfyUI - Arabic Text to Image: Argos Translation Worker
+عملية ترجمة أوفلاين مستقلة — تُشغَّل من _ArgosWorkerPool
+
+كل عامل يحمّل نموذج Argos ar→en مرة واحدة ويخدم الطلبات عبر stdin/stdout
+بصيغة JSON سطر لكل رسالة:
+  ← {"id": 1, "texts": ["...", "..."]}
+  → {"id": 1, "results": ["...", "..."]}      أو  {"id": 1, "error": "❌ ..."}
+  → {"ready": true}                            (مرة واحدة بعد تحميل النموذج)
+
+عدد خيوط ctranslate2 يُحدَّد بـ ARGOS_INTRA_THREADS / ARGOS_INTER_THREADS
+قبل استيراد argostranslate.
+"""
+
+import json
+import os
+import sys
+
+
+def main():
+    # قناة البروتوكول: نسخة خاصة من stdout — أي print آخر يذهب إلى stderr
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8", buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import arabic_text_to_image_node as node
+
+    def send(message):
+        channel.write(json.dumps(message, ensure_ascii=False) + "\n")
+
+    def load():
+        try:
+            return node.ARGOS_TRANSLATOR.get(allow_install=False), ""
+        except node._ArgosUnavailable as e:
+            return None, str(e)
+        except ImportError:
+            return None, "❌ argostranslate غير مثبتة — نفّذ: pip install argostranslate"
+        except Exception as e:
+            return None, f"❌ Argos خطأ: {e}"
+
+    translation, error = load()
+    send({"ready": translation is not None, "error": error})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        if translation is None:
+            translation, error = load()
+        if translation is None:
+            send({"id": request["id"], "error": error})
+            continue
+        try:
+            results = node._argos_translate_batch(translation, request["texts"])
+            send({"id": request["id"], "results": results})
+        except Exception as e:
+            send({"id": request["id"], "error": f"❌ Argos خطأ: {e}"})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+"""
+Arabic Text to Image — Offline Benchmark Suite
+قياس أداء حزمة العقد بدون إنترنت وبدون GPU
+
+يشغّل الحزمة كما هي مع بدائل خفيفة لكل ما هو خارجي:
+  - comfy.sample / comfy.utils / latent_preview  → shims على CPU
+  - MODEL / CLIP / VAE                           → نماذج torch صغيرة بنفس الواجهة
+  - requests (صفحة Google /m)                   → مترجم وهمي بزمن استجابة ثابت
+  - argostranslate                               → نموذج وهمي بزمن لكل حرف
+  - server.PromptServer                          → خادم aiohttp محلي للمسارات
+
+يقيس:
+  ① زمن كل مرحلة: translate (بارد/دافئ) · encode · noise · sample · decode
+  ② إنتاجية /arabic_translate تحت N عميل متزامن
+  ③ الزمن وذروة الذاكرة لكل دقة جاهزة
+ويقارن النتائج بخط أساس محفوظ (baseline.json).
+
+الاستخدام:
+  python benchmarks/bench_arabic_nodes.py                  # تشغيل + مقارنة
+  python benchmarks/bench_arabic_nodes.py --save-baseline  # حفظ خط الأساس
+  python benchmarks/bench_arabic_nodes.py --quick --fail-on-regression
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+
+PACK_DIR         = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+PACK_NAME        = "arabic_t2i_bench_pack"
+
+GOOGLE = "online - Google Translate (إنترنت)"
+ARGOS  = "offline - Argos Translate (لا إنترنت)"
+
+PROMPT = (
+    "امرأة عربية أنيقة في مدينة مستقبلية، إضاءة سينمائية، تفاصيل دقيقة، "
+    "ألوان دافئة، خلفية ضبابية، تصوير احترافي"
+)
+NEGATIVE = "تشوهات، ضبابية، جودة رديئة، علامة مائية"
+
+
+# ──────────────────────────────────────────────
+#  STUBS  (comfy / server / translators)
+# ──────────────────────────────────────────────
+def install_stubs(args):
+    """يسجّل وحدات بديلة في sys.modules قبل تحميل الحزمة."""
+    import torch
+    from aiohttp import web
+
+    # ── comfy.sample ──────────────────────────
+    comfy = types.ModuleType("comfy")
+    comfy.__path__ = []
+
+    sample = types.ModuleType("comfy.sample")
+
+    def prepare_noise(latent_image, seed, noise_inds=None):
+        generator = torch.manual_seed(seed)
+        return torch.randn(latent_image.size(), dtype=latent_image.dtype,
+                           generator=generator, device="cpu")
+
+    def sample_fn(model, noise, steps, cfg, sampler_name, scheduler, positive, negative,
+                  latent_image, denoise=1.0, disable_noise=False, start_step=None,
+                  last_step=None, force_full_denoise=False, noise_mask=None,
+                  sigmas=None, callback=None, disable_pbar=False, seed=None):
+        x = latent_image + noise * denoise
+        for _ in range(max(1, round(steps * denoise))):
+            x = model(x, positive[0][0])
+        return x
+
+    sample.prepare_noise = prepare_noise
+    sample.sample        = sample_fn
+
+    # ── comfy.utils ───────────────────────────
+    utils = types.ModuleType("comfy.utils")
+
+    def common_upscale(samples, width, height, upscale_method, crop):
+        return torch.nn.functional.interpolate(samples, size=(height, width), mode="bilinear")
+
+    utils.common_upscale = common_upscale
+    comfy.sample, comfy.utils = sample, utils
+
+    preview = types.ModuleType("latent_preview")
+    preview.prepare_callback = lambda model, steps, x0_output_dict=None: None
+
+    # ── server.PromptServer ───────────────────
+    server = types.ModuleType("server")
+    server.PromptServer = types.SimpleNamespace(
+        instance=types.SimpleNamespace(routes=web.RouteTableDef())
+    )
+
+    # ── requests (Google وهمي) ────────────────
+    requests = types.ModuleType("requests")
+    google_delay = args.google_latency_ms / 1000.0
+
+    class _Response:
+        status_code = 200
+
+        def __init__(self, text):
+            self.text = f'<div class="result-container">en({text})</div>'
+
+        def close(self):
+            pass
+
+    class Session:
+        def get(self, url, params=None, **kwargs):
+            time.sleep(google_delay)
+            return _Response(params["q"])
+
+    requests.Session = Session
+
+    # ── argostranslate (نموذج وهمي) ───────────
+    argos_dir = tempfile.mkdtemp(prefix="argos_bench_")
+    per_char  = args.argos_ms_per_char / 1000.0
+
+    argos          = types.ModuleType("argostranslate")
+    argos.__path__ = []
+    settings       = types.ModuleType("argostranslate.settings")
+    settings.package_data_dir = argos_dir
+    settings.package_dirs     = [argos_dir]
+    package        = types.ModuleType("argostranslate.package")
+    package.update_package_index   = lambda: None
+    package.get_available_packages = lambda: []
+    translate      = types.ModuleType("argostranslate.translate")
+
+    class _Translation:
+        def translate(self, text):
+            time.sleep(per_char * len(text))
+            return "\n".join(f"en({line})" for line in text.split("\n"))
+
+    class _Language:
+        def __init__(self, code):
+            self.code = code
+
+        def get_translation(self, other):
+            time.sleep(0.05)   # تحميل النموذج
+            return _Translation()
+
+    translate.get_installed_languages = lambda: [_Language("ar"), _Language("en")]
+    argos.settings, argos.package, argos.translate = settings, package, translate
+
+    sys.modules.update({
+        "comfy": comfy, "comfy.sample": sample, "comfy.utils": utils,
+        "latent_preview": preview, "server": server,
+        "requests": requests,
+        "argostranslate": argos, "argostranslate.settings": settings,
+        "argostranslate.package": package, "argostranslate.translate": translate,
+    })
+
+
+def load_pack():
+    """يحمّل الحزمة كما يفعل ComfyUI (حزمة من مجلد)، بدون ذاكرة قرص."""
+    os.environ.setdefault("ARABIC_T2I_TRANSLATION_CACHE_PATH", "")
+    os.environ.setdefault("ARABIC_T2I_RESULT_CACHE_MB", "0")
+    spec = importlib.util.spec_from_file_location(
+        PACK_NAME, os.path.join(PACK_DIR, "__init__.py"),
+        submodule_search_locations=[PACK_DIR],
+    )
+    pack = importlib.util.module_from_spec(spec)
+    sys.modules[PACK_NAME] = pack
+    spec.loader.exec_module(pack)
+    return pack, sys.modules[f"{PACK_NAME}.arabic_text_to_image_node"]
+
+
+# ──────────────────────────────────────────────
+#  STAND-IN MODEL / CLIP / VAE
+# ──────────────────────────────────────────────
+def make_models(dim=768):
+    import torch
+
+    class FakeUNet(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.conv = torch.nn.Conv2d(4, 4, 3, padding=1)
+            self.proj = torch.nn.Linear(dim, 4)
+
+        @torch.no_grad()
+        def forward(self, x, cond):
+            bias = self.proj(cond.mean(dim=1))[:, :, None, None]
+            return x + 0.01 * (self.conv(x) + bias.to(x.dtype))
+
+    class FakeModel:
+        def __init__(self):
+            self.model   = FakeUNet()
+            self.patches = {}
+
+        def __call__(self, x, cond):
+            return self.model(x, cond)
+
+    class FakeTextEncoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.embed = torch.nn.Embedding(4096, dim)
+            self.layer = torch.nn.TransformerEncoderLayer(dim, 8, dim * 2, batch_first=True)
+
+    class FakeCLIP:
+        def __init__(self):
+            self.patcher = types.SimpleNamespace(model=FakeTextEncoder(), patches={})
+
+        def tokenize(self, text):
+            ids = [ord(c) % 4096 for c in text][:75]
+            return ids + [0] * (77 - len(ids))
+
+        @torch.no_grad()
+        def encode_from_tokens(self, tokens, return_pooled=False):
+            encoder = self.patcher.model
+            cond = encoder.layer(encoder.embed(torch.tensor([tokens])))
+            return (cond, cond[:, 0]) if return_pooled else cond
+
+    class FakeVAE:
+        def __init__(self):
+            self.first_stage_model = torch.nn.Conv2d(4, 3, 3, padding=1)
+            self.vae_dtype = torch.float32
+
+        def memory_used_decode(self, shape, dtype):
+            # latent مكبّر ×8 (4 قنوات) + الصورة (3 قنوات)
+            return shape[0] * shape[2] * shape[3] * 64 * 7 * 4
+
+        @torch.no_grad()
+        def decode(self, samples):
+            up = torch.nn.functional.interpolate(samples, scale_factor=8, mode="nearest")
+            return self.first_stage_model(up).clamp(0, 1).movedim(1, -1)
+
+        def decode_tiled(self, samples, tile_x=64, tile_y=64, overlap=16):
+            b, _, h, w = samples.shape
+            out = torch.zeros(b, h * 8, w * 8, 3)
+            step_y, step_x = max(1, tile_y - overlap), max(1, tile_x - overlap)
+            for y in range(0, h, step_y):
+                for x in range(0, w, step_x):
+                    tile = self.decode(samples[:, :, y:y + tile_y, x:x + tile_x])
+                    out[:, y * 8:y * 8 + tile.shape[1], x * 8:x * 8 + tile.shape[2]] = tile
+            return out
+
+    return FakeModel(), FakeCLIP(), FakeVAE()
+
+
+# ──────────────────────────────────────────────
+#  MEASUREMENT HELPERS
+# ──────────────────────────────────────────────
+def timed(fn, *args, repeat=1, **kwargs):
+    """يُعيد (result, أفضل زمن بالميلي ثانية)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, (time.perf_counter() - t0) * 1000.0)
+    return result, best
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PeakMemory:
+    """ذروة الذاكرة أثناء الكتلة: CUDA إن وُجد، وإلا RSS بعيّنات كل 2ms."""
+
+    def __enter__(self):
+        import torch
+        self.cuda = torch.cuda.is_available()
+        if self.cuda:
+            torch.cuda.reset_peak_memory_stats()
+            self.start = torch.cuda.memory_allocated()
+        else:
+            self.start = self.peak = _rss_bytes()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._poll, daemon=True)
+            self._thread.start()
+        return self
+
+    def _poll(self):
+        while not self._stop.wait(0.002):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __exit__(self, *exc):
+        import torch
+        if self.cuda:
+            self.peak = torch.cuda.max_memory_allocated()
+        else:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, _rss_bytes())
+        self.delta_mb = max(0, self.peak - self.start) / (1024 * 1024)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+# ──────────────────────────────────────────────
+#  BENCHMARKS
+# ──────────────────────────────────────────────
+def bench_stages(node_mod, args, results):
+    """① زمن كل مرحلة على دقة واحدة."""
+    import torch
+    import comfy.sample
+
+    model, clip, vae = make_models()
+    w, h = 768, 1024
+
+    for engine, label in ((GOOGLE, "google"), (ARGOS, "argos")):
+        node_mod.TRANSLATION_CACHE.clear()
+        _, cold = timed(node_mod.translate_segmented, [PROMPT, NEGATIVE], engine)
+        _, warm = timed(node_mod.translate_segmented, [PROMPT, NEGATIVE], engine, repeat=5)
+        results[f"stage.translate.{label}.cold_ms"] = cold
+        results[f"stage.translate.{label}.warm_ms"] = warm
+
+    node_mod.COND_CACHE.clear()
+    cond, encode_ms = timed(node_mod.COND_CACHE.encode, clip, PROMPT)
+    _, encode_hit   = timed(node_mod.COND_CACHE.encode, clip, PROMPT, repeat=5)
+    results["stage.encode_ms"]        = encode_ms
+    results["stage.encode_cached_ms"] = encode_hit
+
+    latent = torch.zeros([1, 4, h // 8, w // 8])
+    noise, noise_ms = timed(comfy.sample.prepare_noise, latent, 42, None, repeat=3)
+    results["stage.noise_ms"] = noise_ms
+
+    samples, sample_ms = timed(
+        comfy.sample.sample, model, noise, args.steps, 7.5, "euler", "normal",
+        cond, cond, latent, denoise=1.0,
+    )
+    results["stage.sample_ms"] = sample_ms
+
+    for mode in node_mod.DECODE_MODES:
+        label = mode.split(" ")[0]
+        _, decode_ms = timed(node_mod._decode_latents, vae, samples, mode, 256)
+        results[f"stage.decode.{label}_ms"] = decode_ms
+
+
+def bench_presets(node_mod, args, results):
+    """③ زمن التوليد الكامل وذروة الذاكرة لكل دقة جاهزة."""
+    model, clip, vae = make_models()
+    node = node_mod.ArabicTextToImageNode()
+    presets = [p for p, (w, h) in node_mod.RESOLUTION_PRESETS.items() if w]
+    if args.quick:
+        presets = presets[:2] + presets[-1:]
+
+    # تسخين: أول نداء يدفع تكلفة تهيئة torch
+    node.generate(model, clip, vae, GOOGLE, PROMPT, "", NEGATIVE, "",
+                  presets[0], 512, 512, 1, 7.5, "euler", "normal", 1.0, 0)
+
+    for preset in presets:
+        width, height = node_mod.RESOLUTION_PRESETS[preset]
+        key = f"{width}x{height}"
+        for mode in (node_mod.DECODE_MODES[0], node_mod.DECODE_MODES[1]):
+            label = mode.split(" ")[0]
+            with PeakMemory() as mem:
+                _, ms = timed(
+                    node.generate, model, clip, vae, GOOGLE,
+                    PROMPT, "", NEGATIVE, "", preset, width, height,
+                    args.steps, 7.5, "euler", "normal", 1.0, 42,
+                    decode_mode=mode, decode_memory_mb=512,
+                )
+            results[f"preset.{key}.{label}.generate_ms"] = ms
+            results[f"preset.{key}.{label}.peak_mb"]     = mem.delta_mb
+
+
+def bench_route(pack, node_mod, args, results):
+    """② إنتاجية /arabic_translate تحت N عميل متزامن."""
+    import aiohttp
+    from aiohttp import web
+    from server import PromptServer
+
+    async def run():
+        app = web.Application()
+        app.add_routes(PromptServer.instance.routes)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        url  = f"http://127.0.0.1:{port}/arabic_translate"
+
+        async def scenario(name, make_text):
+            node_mod.TRANSLATION_CACHE.clear()
+            latencies = []
+
+            async def client(cid, session):
+                for i in range(args.requests):
+                    t0 = time.perf_counter()
+                    async with session.post(url, json={"text": make_text(cid, i), "engine": GOOGLE}) as r:
+                        await r.json()
+                    latencies.append((time.perf_counter() - t0) * 1000.0)
+
+            t0 = time.perf_counter()
+            async with aiohttp.ClientSession() as session:
+                await asyncio.gather(*[client(c, session) for c in range(args.clients)])
+            wall = time.perf_counter() - t0
+
+            results[f"route.{name}.rps"]    = len(latencies) / wall
+            results[f"route.{name}.p50_ms"] = statistics.median(latencies)
+            results[f"route.{name}.p95_ms"] = percentile(latencies, 0.95)
+
+        await scenario("unique",   lambda cid, i: f"{PROMPT} {cid}-{i}")
+        await scenario("repeated", lambda cid, i: f"{NEGATIVE} {i % 4}")
+        await runner.cleanup()
+
+    asyncio.run(run())
+
+
+# ──────────────────────────────────────────────
+#  BASELINE
+# ──────────────────────────────────────────────
+_HIGHER_IS_BETTER = (".rps",)
+_NOISE_FLOOR_MS   = 1.0   # فروق أقل من 1ms (إصابات الذاكرة) ضجيج قياس لا تراجع
+
+
+def compare(results, baseline, tolerance):
+    """يُعيد قائمة التراجعات [(metric, baseline, current, ratio)]."""
+    regressions = []
+    for metric, current in sorted(results.items()):
+        base = baseline.get(metric)
+        if not base:
+            continue
+        ratio = current / base
+        if metric.endswith("_ms") and current - base < _NOISE_FLOOR_MS:
+            continue
+        worse = ratio < 1 - tolerance if metric.endswith(_HIGHER_IS_BETTER) else ratio > 1 + tolerance
+        if worse:
+            regressions.append((metric, base, current, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arabic T2I offline benchmarks")
+    parser.add_argument("--quick", action="store_true", help="عدد أقل من الدقات والطلبات")
+    parser.add_argument("--steps", type=int, default=4, help="خطوات الـ sampler الوهمي")
+    parser.add_argument("--clients", type=int, default=20, help="عملاء متزامنون للمسار")
+    parser.add_argument("--requests", type=int, default=10, help="طلبات لكل عميل")
+    parser.add_argument("--google-latency-ms", type=float, default=80.0)
+    parser.add_argument("--argos-ms-per-char", type=float, default=0.3)
+    parser.add_argument("--only", choices=["stages", "presets", "route"], action="append")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="نسبة التراجع المسموحة")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--json", help="حفظ النتائج في ملف")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.clients, args.requests = min(args.clients, 8), min(args.requests, 5)
+
+    install_stubs(args)
+    pack, node_mod = load_pack()
+
+    only = set(args.only or ["stages", "presets", "route"])
+    results = {}
+    if "stages" in only:
+        bench_stages(node_mod, args, results)
+    if "presets" in only:
+        bench_presets(node_mod, args, results)
+    if "route" in only:
+        bench_route(pack, node_mod, args, results)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"\n{'metric':<48}{'current':>12}{'baseline':>12}")
+    for metric, value in sorted(results.items()):
+        base = baseline.get(metric)
+        print(f"{metric:<48}{value:>12.2f}{(f'{base:.2f}' if base else '—'):>12}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n💾 خط الأساس محفوظ: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ تراجعات (> {args.tolerance:.0%}):")
+        for metric, base, current, ratio in regressions:
+            print(f"  {metric}: {base:.2f} → {current:.2f}  (×{ratio:.2f})")
+        if args.fail_on_regression:
+            return 1
+    elif baseline:
+        print("\n✅ لا تراجعات مقارنة بخط الأساس")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Arabic Text to Image — Import-Time Budget Check
+فحص زمن تحميل الحزمة عند بدء ComfyUI
+
+يحمّل الحزمة في عملية جديدة (كما يفعل ComfyUI عند كل تشغيل) ويفشل إذا:
+  - تجاوز زمن التحميل الميزانية (افتراضياً 150ms، أو ARABIC_T2I_IMPORT_BUDGET_MS)
+  - استُورِدت مكتبة ثقيلة أثناء التحميل (torch, numpy, requests, argostranslate)
+
+aiohttp و PromptServer محمّلان مسبقاً في ComfyUI، فيُستوردان قبل بدء القياس.
+
+الاستخدام:
+  python benchmarks/check_import_time.py [--budget-ms 150] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY    = ("torch", "numpy", "requests", "argostranslate", "comfy", "sqlite3")
+
+_CHILD = r"""
+import importlib.util, json, os, sys, time, types
+try:
+    from aiohttp import web
+    server = types.ModuleType("server")
+    server.PromptServer = types.SimpleNamespace(instance=types.SimpleNamespace(routes=web.RouteTableDef()))
+    sys.modules["server"] = server
+except ImportError:
+    pass
+import asyncio, concurrent.futures
+before = set(sys.modules)
+pack_dir = sys.argv[1]
+spec = importlib.util.spec_from_file_location(
+    "arabic_t2i_import_check", os.path.join(pack_dir, "__init__.py"),
+    submodule_search_locations=[pack_dir],
+)
+module = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = module
+t0 = time.perf_counter()
+spec.loader.exec_module(module)
+ms = (time.perf_counter() - t0) * 1000.0
+loaded = sorted({name.split(".")[0] for name in set(sys.modules) - before})
+sys.stdout.write("\n" + json.dumps({"ms": ms, "loaded": loaded}) + "\n")
+"""
+
+
+def measure() -> dict:
+    env = dict(os.environ, ARABIC_T2I_ARGOS_PRELOAD="0")
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, PACK_DIR],
+        capture_output=True, text=True, env=env, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arabic T2I import-time budget check")
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("ARABIC_T2I_IMPORT_BUDGET_MS", "150")))
+    parser.add_argument("--runs", type=int, default=5, help="أفضل زمن من عدة تشغيلات")
+    args = parser.parse_args(argv)
+
+    runs  = [measure() for _ in range(max(1, args.runs))]
+    best  = min(run["ms"] for run in runs)
+    heavy = sorted({name for run in runs for name in run["loaded"] if name in HEAVY})
+
+    print(f"⏱️  زمن تحميل الحزمة: {best:.1f}ms  (الميزانية {args.budget_ms:.0f}ms)")
+    print(f"📦 وحدات جديدة: {', '.join(runs[0]['loaded'])}")
+
+    failed = False
+    if best > args.budget_ms:
+        print("❌ تجاوز زمن التحميل الميزانية")
+        failed = True
+    if heavy:
+        print(f"❌ مكتبات ثقيلة استُوردت أثناء التحميل: {', '.join(heavy)}")
+        failed = True
+    if not failed:
+        print("✅ ضمن الميزانية")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Arabic Text to Image — Local Google Translate Stand-in
+خادم ترجمة محلي بديل لـ Google لاختبار المحرك التلقائي (auto) بدون إنترنت
+
+يُقلّد صفحة translate.google.com/m التي يقرأها محرك Google في الحزمة، مع زمن استجابة
+ونسب أخطاء/تعليق قابلة للضبط — وتغييرها أثناء التشغيل لمحاكاة انقطاع الشبكة.
+
+الاستخدام:
+  python benchmarks/google_standin_server.py --port 8765 --latency-ms 200
+  ARABIC_T2I_GOOGLE_BASE_URL=http://127.0.0.1:8765/m  (قبل تشغيل ComfyUI)
+
+تغيير السلوك أثناء التشغيل:
+  curl "http://127.0.0.1:8765/control?fail_rate=1"        # كل الطلبات 500 → يُفتح القاطع
+  curl "http://127.0.0.1:8765/control?hang_rate=1"        # تعليق → المهلة + التحوّط بـ Argos
+  curl "http://127.0.0.1:8765/control?fail_rate=0&hang_rate=0&latency_ms=50"
+"""
+
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StandinState:
+    def __init__(self, latency_ms: float, jitter_ms: float, fail_rate: float,
+                 hang_rate: float, hang_s: float, seed: int):
+        self.lock     = threading.Lock()
+        self.settings = {
+            "latency_ms": latency_ms,
+            "jitter_ms":  jitter_ms,
+            "fail_rate":  fail_rate,
+            "hang_rate":  hang_rate,
+            "hang_s":     hang_s,
+        }
+        self.counts = {"ok": 0, "fail": 0, "hang": 0}
+        self.random = random.Random(seed)
+
+    def plan(self) -> tuple:
+        """يختار سلوك الطلب: ("ok" | "fail" | "hang", زمن الانتظار بالثواني)."""
+        with self.lock:
+            s    = self.settings
+            roll = self.random.random()
+            if roll < s["hang_rate"]:
+                kind, delay = "hang", s["hang_s"]
+            elif roll < s["hang_rate"] + s["fail_rate"]:
+                kind, delay = "fail", s["latency_ms"] / 1000.0
+            else:
+                jitter = self.random.uniform(-s["jitter_ms"], s["jitter_ms"])
+                kind, delay = "ok", max(0.0, s["latency_ms"] + jitter) / 1000.0
+            self.counts[kind] += 1
+            return kind, delay
+
+
+def make_handler(state: StandinState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8"):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url    = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+            if url.path == "/control":
+                with state.lock:
+                    for key, value in params.items():
+                        if key in state.settings:
+                            state.settings[key] = float(value)
+                    body = json.dumps({"settings": state.settings, "counts": state.counts})
+                return self._send(200, body, "application/json")
+
+            kind, delay = state.plan()
+            time.sleep(delay)
+            if kind == "fail":
+                return self._send(500, "stand-in failure")
+            text = params.get("q", "")
+            self._send(200, f'<html><body><div class="result-container">en({html.escape(text)})</div></body></html>')
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Google Translate stand-in for the auto engine")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="نسبة الردود 500")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="نسبة الطلبات المعلّقة")
+    parser.add_argument("--hang-s", type=float, default=60.0, help="مدة التعليق بالثواني")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    state  = StandinState(args.latency_ms, args.jitter_ms, args.fail_rate,
+                          args.hang_rate, args.hang_s, args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"🌐 Google stand-in: http://{args.host}:{args.port}/m  (control: /control?fail_rate=1)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
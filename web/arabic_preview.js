@@ -1,5 +1,5 @@
 /**
- * Arabic Nodes — Live Translation Preview  v3
+ * Arabic Nodes — Live Translation Preview  v4
  * معاينة الترجمة الحية لعقدتَي ArabicTextToImage و ArabicPromptBuilder
  *
  * الميزات:
@@ -14,7 +14,10 @@
  *  المشترك:
  *     - مؤشر حالة (⏳ / ✅ / ❌ / ℹ️)
  *     - زر ⎘ نسخ لكل مربع
- *     - لا طلبات مكررة (cache بسيط بالنص + المحرك)
+ *     - ذاكرة ترجمة مشتركة بين كل العقد (LRU) تبقى بعد إعادة التحميل (localStorage)
+ *     - النص الجاري ترجمته لعقدة لا يُطلب مرة ثانية لعقدة أخرى
+ *     - طلب /arabic_translate/batch واحد لكل مربعات العقدة (إيجابي + سلبي معاً)
+ *     - الطلب الأقدم يُلغى (AbortController) والردود المتأخرة تُتجاهل (رقم تسلسلي)
  */
 
 import { app } from "../../scripts/app.js";
@@ -22,8 +25,64 @@ import { app } from "../../scripts/app.js";
 // ═══════════════════════════════════════════════
 //  ثوابت
 // ═══════════════════════════════════════════════
-const API          = "/arabic_translate";
-const DEBOUNCE_MS  = 800;
+const BATCH_API     = "/arabic_translate/batch";
+const DEBOUNCE_MS   = 800;
+const CACHE_KEY     = "arabicNodes.translationCache.v1";
+const CACHE_MAX     = 500;
+const SAVE_DELAY_MS = 1000;
+
+// ═══════════════════════════════════════════════
+//  ذاكرة ترجمة مشتركة (LRU) — محفوظة في localStorage
+//  المفتاح: المحرك + النص · تُحفظ الترجمات الناجحة (✅) فقط
+//  نتائج auto لا تُحفظ: قد تكون إجابة Argos احتياطية أثناء تعطل Google
+// ═══════════════════════════════════════════════
+const isAutoEngine = (engineOrKey) => engineOrKey.startsWith("auto");
+
+const sharedCache = (() => {
+  const map = new Map();
+  let saveTimer = null;
+
+  try {
+    for (const [key, value] of JSON.parse(localStorage.getItem(CACHE_KEY) ?? "[]")) {
+      if (!isAutoEngine(key)) map.set(key, value);
+    }
+  } catch {
+    // التخزين معطل أو تالف — نبدأ بذاكرة فارغة
+  }
+
+  function save() {
+    clearTimeout(saveTimer);
+    saveTimer = setTimeout(() => {
+      try {
+        localStorage.setItem(CACHE_KEY, JSON.stringify([...map]));
+      } catch {
+        // الحصة ممتلئة — الذاكرة تبقى للصفحة الحالية فقط
+      }
+    }, SAVE_DELAY_MS);
+  }
+
+  return {
+    get(key) {
+      const value = map.get(key);
+      if (value !== undefined) {
+        map.delete(key);   // الأحدث استخداماً في آخر الترتيب
+        map.set(key, value);
+      }
+      return value;
+    },
+    set(key, value) {
+      map.delete(key);
+      map.set(key, value);
+      while (map.size > CACHE_MAX) map.delete(map.keys().next().value);
+      save();
+    },
+  };
+})();
+
+// مفتاح → Promise<{text, status} | null> لنص يُترجم الآن في طلب عقدة أخرى
+const inflight = new Map();
+
+const cacheKey = (engine, text) => `${engine}\u0001${text}`;
 
 // ═══════════════════════════════════════════════
 //  مصنع بناء مربع المعاينة
@@ -121,56 +180,158 @@ function makePreviewBox(accentHex, labelText) {
 }
 
 // ═══════════════════════════════════════════════
-//  دالة الترجمة عبر API
+//  دالة الترجمة عبر API — طلب واحد لكل النصوص
 // ═══════════════════════════════════════════════
-async function fetchTranslation(text, engine) {
+// clientId: معرّف العقدة — الخادم يلغي الطلب الأقدم عند وصول طلب أحدث
+// signal:   إلغاء الطلب من المتصفح عند بدء طلب أحدث لنفس العقدة
+async function fetchTranslations(texts, engine, clientId, signal) {
   try {
-    const r = await fetch(API, {
+    const r = await fetch(BATCH_API, {
       method:  "POST",
       headers: { "Content-Type": "application/json" },
-      body:    JSON.stringify({ text, engine }),
+      body:    JSON.stringify({ texts, engine, client_id: clientId }),
+      signal,
     });
     if (!r.ok) throw new Error(`HTTP ${r.status}`);
     const d = await r.json();
-    return { ok: true, text: d.translated, status: d.status };
+    return {
+      ok:         true,
+      results:    (d.results ?? []).map((x) => ({ text: x.translated, status: x.status })),
+      superseded: !!d.superseded,
+    };
   } catch (e) {
-    return { ok: false, text: "", status: `❌ ${e.message}` };
+    if (e.name === "AbortError") return { ok: false, results: [], aborted: true };
+    return { ok: false, results: [], status: `❌ ${e.message}` };
   }
 }
 
 // ═══════════════════════════════════════════════
-//  مساعد: إنشاء منطق debounce + cache لمربع واحد
+//  ترجمة نصوص عقدة: الذاكرة المشتركة ← الطلبات الجارية ← طلب /batch للباقي
+//  يُعيد { ok, results: [{text, status}], aborted?, superseded?, status? }
 // ═══════════════════════════════════════════════
-function makeTranslator(boxApi, getSource, getEngine, hiddenWidget, node) {
-  let timer   = null;
-  let lastKey = "";
+async function translateTexts(texts, engine, clientId, signal) {
+  const results = new Array(texts.length);
+  const missing = [];   // فهارس تحتاج طلباً
+  const waiting = [];   // [فهرس, Promise] لنصوص تُترجم لعقدة أخرى
+
+  texts.forEach((text, i) => {
+    const key = cacheKey(engine, text);
+    const hit = sharedCache.get(key);
+    if (hit) results[i] = hit;
+    else if (inflight.has(key)) waiting.push([i, inflight.get(key)]);
+    else missing.push(i);
+  });
 
-  async function run() {
-    const engine  = getEngine();
-    const text    = getSource().trim();
+  async function request(indices) {
+    const unique = [...new Set(indices.map((i) => texts[i]))];
+    if (!unique.length) return { ok: true };
+
+    const pending = unique.map((text) => {
+      let resolve;
+      const promise = new Promise((r) => (resolve = r));
+      const key = cacheKey(engine, text);
+      inflight.set(key, promise);
+      return { key, promise, resolve };
+    });
+
+    const res = await fetchTranslations(unique, engine, clientId, signal);
+    const byText = new Map();
+    pending.forEach((p, j) => {
+      const value = res.ok && !res.superseded ? res.results[j] ?? null : null;
+      if (value?.status?.startsWith("✅") && !isAutoEngine(engine)) sharedCache.set(p.key, value);
+      if (inflight.get(p.key) === p.promise) inflight.delete(p.key);
+      p.resolve(value);   // null → العقد المنتظرة تطلبه بنفسها
+      byText.set(unique[j], value);
+    });
+    indices.forEach((i) => (results[i] = byText.get(texts[i])));
+    return res;
+  }
+
+  const [res, shared] = await Promise.all([
+    request(missing),
+    Promise.all(waiting.map(([, promise]) => promise)),
+  ]);
+  if (!res.ok || res.superseded) return res;
+
+  // الطلب الذي انتظرناه أُلغي أو فشل — نطلب تلك النصوص بأنفسنا
+  const retry = [];
+  waiting.forEach(([i], j) => (shared[j] ? (results[i] = shared[j]) : retry.push(i)));
+  if (retry.length) {
+    const again = await request(retry);
+    if (!again.ok || again.superseded) return again;
+  }
+  return { ok: true, results };
+}
+
+// حالة واحدة لعدة أجزاء: أول خطأ إن وُجد، وإلا أول حالة
+function mergeStatus(parts) {
+  const bad = parts.find((p) => !p.status?.startsWith("✅"));
+  return (bad ?? parts[0])?.status;
+}
 
-    if (!text) { boxApi.setEmpty(); return; }
+// ═══════════════════════════════════════════════
+//  مساعد: إنشاء منطق debounce + cache لمربعات عقدة واحدة
+//  targets: [{ api, getTexts: () => [نص, ...], hidden }]
+//  كل نصوص العقدة تُرسل في طلب /batch واحد
+// ═══════════════════════════════════════════════
+function makeTranslator(targets, getEngine, node) {
+  let timer      = null;
+  let lastKey    = "";
+  let seq        = 0;      // رقم آخر تشغيل — الردود الأقدم تُتجاهل
+  let controller = null;   // AbortController للطلب الجاري
+  const clientId = `${node.id}:${Math.random().toString(36).slice(2)}`;
+
+  async function run() {
+    const engine = getEngine();
+    const groups = targets.map((t) =>
+      t.getTexts().map((s) => s.trim()).filter(Boolean)
+    );
 
     if (engine.startsWith("disable")) {
-      boxApi.setDisabled(text);
-      if (hiddenWidget) hiddenWidget.value = text;
+      lastKey = "";
+      seq += 1;
+      controller?.abort();
+      targets.forEach((t, i) => {
+        const raw = groups[i].join(", ");
+        if (!raw) { t.api.setEmpty(); return; }
+        t.api.setDisabled(raw);
+        if (t.hidden) t.hidden.value = raw;
+      });
       return;
     }
 
-    const key = `${text}||${engine}`;
+    const key = JSON.stringify([groups, engine]);
     if (key === lastKey) return;
     lastKey = key;
 
-    boxApi.setLoading();
-    const res = await fetchTranslation(text, engine);
-
-    if (res.ok && res.text) {
-      boxApi.setResult(res.text, res.status);
-      if (hiddenWidget) hiddenWidget.value = res.text;
-    } else {
-      boxApi.setError(res.status);
-      if (hiddenWidget) hiddenWidget.value = "";
-    }
+    const texts = groups.flat();
+    targets.forEach((t, i) => (groups[i].length ? t.api.setLoading() : t.api.setEmpty()));
+    if (!texts.length) return;
+
+    const mySeq = ++seq;
+    controller?.abort();
+    controller = new AbortController();
+
+    const res = await translateTexts(texts, engine, clientId, controller.signal);
+    if (mySeq !== seq || res.aborted || res.superseded) return;   // طلب أحدث في الطريق
+
+    let offset = 0;
+    targets.forEach((t, i) => {
+      const n = groups[i].length;
+      if (!n) return;
+      const parts = res.results.slice(offset, offset + n).filter(Boolean);
+      offset += n;
+
+      const translated = parts.map((p) => p.text).filter(Boolean).join(", ");
+      if (res.ok && parts.length === n && translated) {
+        t.api.setResult(translated, mergeStatus(parts));
+        if (t.hidden) t.hidden.value = translated;
+      } else {
+        t.api.setError(res.status ?? mergeStatus(parts) ?? "❌");
+        if (t.hidden) t.hidden.value = "";
+      }
+    });
+    if (!res.ok) lastKey = "";
     node.setDirtyCanvas(true, true);
   }
 
@@ -187,7 +348,7 @@ function makeTranslator(boxApi, getSource, getEngine, hiddenWidget, node) {
 //  تسجيل الامتداد
 // ═══════════════════════════════════════════════
 app.registerExtension({
-  name: "ArabicNodes.LiveTranslationPreview.v3",
+  name: "ArabicNodes.LiveTranslationPreview.v4",
 
   async nodeCreated(node) {
     const cls = node.comfyClass;
@@ -230,21 +391,13 @@ app.registerExtension({
         serializeValue: false,
       });
 
-      // ── منطق الترجمة ──────────────────────────
-      const getEngine = () => engineW.value ?? "";
-
-      const posTr = makeTranslator(
-        pos.api,
-        () => posW.value ?? "",
-        getEngine,
-        posPrevW,
-        node,
-      );
-      const negTr = makeTranslator(
-        neg.api,
-        () => negW.value ?? "",
-        getEngine,
-        negPrevW,
+      // ── منطق الترجمة (طلب واحد للإيجابي والسلبي) ──
+      const tr = makeTranslator(
+        [
+          { api: pos.api, getTexts: () => [posW.value ?? ""], hidden: posPrevW },
+          { api: neg.api, getTexts: () => [negW.value ?? ""], hidden: negPrevW },
+        ],
+        () => engineW.value ?? "",
         node,
       );
 
@@ -252,12 +405,13 @@ app.registerExtension({
       const origCb = node.onWidgetChanged?.bind(node);
       node.onWidgetChanged = function (name, value, oldValue, widget) {
         origCb?.(name, value, oldValue, widget);
-        if (name === "positive_prompt"    || name === "translation_engine") posTr.schedule();
-        if (name === "negative_prompt"    || name === "translation_engine") negTr.schedule();
+        if (["positive_prompt", "negative_prompt", "translation_engine"].includes(name)) {
+          tr.schedule();
+        }
       };
 
       // تشغيل أولي
-      setTimeout(() => { posTr.runNow(); negTr.runNow(); }, 400);
+      setTimeout(tr.runNow, 400);
     }
 
     // ════════════════════════════════════════════
@@ -280,17 +434,10 @@ app.registerExtension({
         serializeValue: false,
       });
 
-      const getCombined = () =>
-        [subjectW.value ?? "", envW?.value ?? ""]
-          .map((s) => s.trim())
-          .filter(Boolean)
-          .join("، ");
-
+      // الموضوع والبيئة يُترجمان كجزأين ثم يُدمجان بفاصلة — مثل build()
       const tr = makeTranslator(
-        box.api,
-        getCombined,
+        [{ api: box.api, getTexts: () => [subjectW.value ?? "", envW?.value ?? ""], hidden: prevW }],
         () => engineW.value ?? "",
-        prevW,
         node,
       );
 